@@ -2,6 +2,8 @@
 import heapq
 import time
 
+from tiled_grid import grid_access
+
 class Node:
     def __init__(self, position, g_score=0, h_score=0, parent=None):
         self.position = position
@@ -21,10 +23,74 @@ def reconstruct_path(node):
         current = current.parent
     return path[::-1]
 
-def a_star_search(grid, start, goal, heuristic_func, allow_diagonal=False):
+# How many expansions happen between deadline / should_stop checks
+# (time.time() and job store lookups are not free)
+DEADLINE_CHECK_INTERVAL = 256
+
+def budget_exhausted_result(reason, partial_path, explored_order, elapsed):
+    """
+    Result returned when a search stops early. 'partial_path' leads from the
+    start to the expanded node closest to the goal by the heuristic.
+    """
+    return {
+        'success': False,
+        'budget_exhausted': True,
+        'stop_reason': reason,
+        'path': [],
+        'partial_path': partial_path,
+        'explored': explored_order,
+        'nodes_explored': len(explored_order),
+        'path_length': 0,
+        'time_taken': elapsed
+    }
+
+def a_star_search(grid, start, goal, heuristic_func, allow_diagonal=False,
+                  max_nodes=None, deadline_ms=None, should_stop=None):
+    """
+    A* search on a 2D grid (0=walkable, 1=wall)
+
+    Args:
+        grid: 2D list / numpy array, or a TiledGrid for maps kept on disk
+        max_nodes: stop after expanding this many nodes (None = unlimited)
+        deadline_ms: stop after this many milliseconds (None = unlimited)
+        should_stop: optional callable(nodes_explored) polled every
+                     DEADLINE_CHECK_INTERVAL expansions; returning True stops
+                     the search (used to cancel running jobs)
+
+    Returns:
+        dict: search result; when a budget runs out, 'budget_exhausted' is True
+              and 'stop_reason' is 'max_nodes', 'deadline' or 'cancelled'
+    """
+    return run_to_completion(a_star_steps(grid, start, goal, heuristic_func, allow_diagonal,
+                                          max_nodes, deadline_ms, should_stop=should_stop))
+
+def run_to_completion(steps):
+    """Drive a search generator to the end and return its result"""
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+def a_star_steps(grid, start, goal, heuristic_func, allow_diagonal=False,
+                 max_nodes=None, deadline_ms=None, slice_nodes=None, should_stop=None,
+                 deadline=None):
+    """
+    A* as a resumable generator, so several searches can be interleaved.
+
+    Every slice_nodes expansions it yields {'nodes_explored', 'lower_bound'},
+    where lower_bound is the f-score of the last expanded node (a lower bound
+    on the optimal path cost when the heuristic is consistent). With
+    slice_nodes=None it never yields. The search result is the generator's
+    return value (see run_to_completion).
+
+    deadline_ms counts from the first next(); pass an absolute time.time()
+    value as deadline instead when several searches share one deadline.
+    """
     start_time = time.time()
-    rows = len(grid)
-    cols = len(grid[0])
+    if deadline is None and deadline_ms is not None:
+        deadline = start_time + deadline_ms / 1000.0
+    rows, cols, is_open = grid_access(grid)
     
     start_tuple = tuple(start)
     goal_tuple = tuple(goal)
@@ -41,8 +107,23 @@ def a_star_search(grid, start, goal, heuristic_func, allow_diagonal=False):
         directions += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
         
     g_scores = {start_tuple: 0}
+    best_node = None
+    last_check = -DEADLINE_CHECK_INTERVAL  # check before the first expansion too
 
     while open_list:
+        expanded = len(explored_order)
+        if max_nodes is not None and expanded >= max_nodes:
+            return budget_exhausted_result('max_nodes', reconstruct_path(best_node),
+                                           explored_order, time.time() - start_time)
+        if expanded - last_check >= DEADLINE_CHECK_INTERVAL:
+            last_check = expanded
+            if deadline is not None and time.time() >= deadline:
+                return budget_exhausted_result('deadline', reconstruct_path(best_node),
+                                               explored_order, time.time() - start_time)
+            if should_stop is not None and should_stop(expanded):
+                return budget_exhausted_result('cancelled', reconstruct_path(best_node),
+                                               explored_order, time.time() - start_time)
+
         current = heapq.heappop(open_list)
         current_pos = current.position
         
@@ -50,13 +131,18 @@ def a_star_search(grid, start, goal, heuristic_func, allow_diagonal=False):
             continue
             
         closed_set.add(current_pos)
+        if best_node is None or current.h_score < best_node.h_score:
+            best_node = current
         explored_order.append(list(current_pos)) 
+        if slice_nodes and len(explored_order) % slice_nodes == 0:
+            yield {'nodes_explored': len(explored_order), 'lower_bound': current.f_score}
         
         if current_pos == goal_tuple:
             path = reconstruct_path(current)
             elapsed = time.time() - start_time
             return {
                 'success': True,
+                'budget_exhausted': False,
                 'path': path,
                 'explored': explored_order,
                 'nodes_explored': len(explored_order),
@@ -68,7 +154,7 @@ def a_star_search(grid, start, goal, heuristic_func, allow_diagonal=False):
             nr, nc = current_pos[0] + dr, current_pos[1] + dc
             neighbor_pos = (nr, nc)
             
-            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] == 0:
+            if 0 <= nr < rows and 0 <= nc < cols and is_open(nr, nc):
                 if neighbor_pos in closed_set:
                     continue
                     
@@ -89,6 +175,7 @@ def a_star_search(grid, start, goal, heuristic_func, allow_diagonal=False):
     elapsed = time.time() - start_time
     return {
         'success': False,
+        'budget_exhausted': False,
         'path': [],
         'explored': explored_order,
         'nodes_explored': len(explored_order),
@@ -1,10 +1,19 @@
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, Response, jsonify, request, send_file
 from flask_cors import CORS
 from algorithms import a_star_search
-from heuristics import get_heuristic
+from heuristics import HEURISTICS, get_heuristic
 from utils import generate_random_maze
+from maze import Grid
+from experiments import run_single_experiment
+from jobs import JobCancelled, JobManager, JobQueueFull, create_job_store
+from flowfield import DistanceFieldCache, path_from_field
+from distance_matrix import compute_distance_matrix
+from wavefront import wavefront_search
+from corridors import corridor_search
+from race import race_heuristics
 import csv
 import os
+import time
 from datetime import datetime
 
 app = Flask(__name__)
@@ -12,18 +21,44 @@ CORS(app)
 
 # --- CSV SETUP ---
 DATA_DIR = 'data'
-CSV_FILE = os.path.join(DATA_DIR, 'experiments.csv')
+CSV_FILE = os.environ.get('EXPERIMENTS_CSV', os.path.join(DATA_DIR, 'experiments.csv'))
 
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
-def log_to_csv(results, maze_size):
+CSV_HEADER = ['Timestamp', 'Maze Size', 'Heuristic', 'Nodes Explored', 'Path Length', 'Time (s)',
+              'Wall Density']
+
+def _upgrade_csv_header():
+    """
+    Files written before 'Wall Density' existed get the column added (blank
+    for old rows). Runs once at import; the rewrite goes through a temporary
+    file and os.replace so a worker starting at the same time never reads a
+    half-written file.
+    """
+    if not os.path.isfile(CSV_FILE):
+        return
+    with open(CSV_FILE, newline='') as f:
+        rows = list(csv.reader(f))
+    if not rows or rows[0] == CSV_HEADER:
+        return
+    tmp_path = f"{CSV_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for row in rows[1:]:
+            writer.writerow(row + [''] * (len(CSV_HEADER) - len(row)))
+    os.replace(tmp_path, CSV_FILE)
+
+_upgrade_csv_header()
+
+def log_to_csv(results, maze_size, density=None):
     """Saves every comparison run to the CSV dataset."""
     file_exists = os.path.isfile(CSV_FILE)
     with open(CSV_FILE, 'a', newline='') as f:
         writer = csv.writer(f)
         if not file_exists:
-            writer.writerow(['Timestamp', 'Maze Size', 'Heuristic', 'Nodes Explored', 'Path Length', 'Time (s)'])
+            writer.writerow(CSV_HEADER)
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         for res in results:
@@ -33,9 +68,180 @@ def log_to_csv(results, maze_size):
                 res['heuristic'], 
                 res['nodes_explored'], 
                 res['path_length'], 
-                f"{res['time_taken']:.6f}"
+                f"{res['time_taken']:.6f}",
+                f"{density:.3f}" if density is not None else ''
             ])
 
+# --- SEARCH BUDGETS ---
+# Server-wide caps on work per request; 0 means unlimited. Jobs run in the
+# background, so they get their own (by default unlimited) caps.
+MAX_NODES = int(os.environ.get('MAX_NODES', 0))
+MAX_DEADLINE_MS = int(os.environ.get('MAX_DEADLINE_MS', 30000))
+JOB_MAX_NODES = int(os.environ.get('JOB_MAX_NODES', 0))
+JOB_MAX_DEADLINE_MS = int(os.environ.get('JOB_MAX_DEADLINE_MS', 0))
+
+def _capped(value, cap):
+    """Combine a requested limit with a server cap (None/0 = unlimited)."""
+    if value is not None:
+        value = max(int(value), 0)
+    if not cap:
+        return value
+    return cap if value is None else min(value, cap)
+
+def get_budget(data, context=None):
+    """
+    Read 'max_nodes' and 'deadline_ms' from a request, clamped to the caps.
+
+    Returns:
+        tuple: (max_nodes, deadline_ms), either may be None for unlimited
+    """
+    if context:
+        caps = (JOB_MAX_NODES, JOB_MAX_DEADLINE_MS)
+    else:
+        caps = (MAX_NODES, MAX_DEADLINE_MS)
+    return (_capped(data.get('max_nodes'), caps[0]),
+            _capped(data.get('deadline_ms'), caps[1]))
+
+# Search engines selectable with the 'algorithm' field; all share a_star_search's signature
+ALGORITHMS = {
+    'astar': a_star_search,
+    'wavefront': wavefront_search,
+    'corridor': corridor_search
+}
+
+def get_algorithm(data):
+    name = data.get('algorithm', 'astar')
+    if name not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{name}'")
+    return ALGORITHMS[name]
+
+def parse_grid(data):
+    """Convert the request's grid to a Grid once, at the API boundary."""
+    data['grid'] = Grid.from_any(data['grid'])
+    return data['grid']
+
+def check_cell(grid, cell, name):
+    """Raise ValueError unless cell is an integer [row, col] inside the grid."""
+    if not isinstance(cell, (list, tuple)) or len(cell) != 2 or \
+            not all(isinstance(v, int) and not isinstance(v, bool) for v in cell):
+        raise ValueError(f"'{name}' must be [row, col] integers")
+    if not (0 <= cell[0] < grid.rows and 0 <= cell[1] < grid.cols):
+        raise ValueError(f"'{name}' {list(cell)} is outside the {grid.rows}x{grid.cols} grid")
+
+def check_endpoints(data):
+    """Raise ValueError unless 'start' and 'goal' are cells of the request's grid."""
+    grid = Grid.from_any(data['grid'])
+    check_cell(grid, data['start'], 'start')
+    check_cell(grid, data['goal'], 'goal')
+
+def run_solve(data, context=None):
+    """Solve one maze with one heuristic. Shared by /solve and solve jobs."""
+    grid, start, goal = parse_grid(data), data['start'], data['goal']
+    heuristic_name = data.get('heuristic', 'manhattan')
+    search = get_algorithm(data)
+    max_nodes, deadline_ms = get_budget(data, context)
+    # Progress is nodes expanded out of all open cells, an upper bound on the work
+    open_cells = grid.rows * grid.cols - grid.cells.count(1)
+    should_stop = context.stop_check(open_cells) if context else None
+    result = search(grid, start, goal, get_heuristic(heuristic_name),
+                    max_nodes=max_nodes, deadline_ms=deadline_ms, should_stop=should_stop)
+    if result.get('stop_reason') == 'cancelled':
+        raise JobCancelled(context.job_id)
+    result['heuristic'] = heuristic_name
+    return result
+
+def run_compare(data, context=None):
+    """
+    Solve one maze with each requested heuristic and log the run to CSV.
+    All heuristics share one overall deadline; max_nodes applies to each.
+    Only A* runs are logged: the other engines ignore the heuristic, and
+    race.learned_order ranks heuristics from the logged node counts.
+    """
+    grid, start, goal = parse_grid(data), data['start'], data['goal']
+    heuristics = data.get('heuristics', ['manhattan'])
+    search = get_algorithm(data)
+    max_nodes, deadline_ms = get_budget(data, context)
+    deadline = time.time() + deadline_ms / 1000.0 if deadline_ms is not None else None
+    open_cells = grid.rows * grid.cols - grid.cells.count(1)
+
+    results = []
+    for i, name in enumerate(heuristics):
+        if context:
+            context.check_cancelled()
+        h_func = get_heuristic(name)
+        if not h_func: continue
+        remaining_ms = None
+        if deadline is not None:
+            remaining_ms = max((deadline - time.time()) * 1000.0, 0)
+        should_stop = context.stop_check(open_cells, i, len(heuristics)) if context else None
+        result = search(grid, start, goal, h_func,
+                        max_nodes=max_nodes, deadline_ms=remaining_ms, should_stop=should_stop)
+        if result.get('stop_reason') == 'cancelled':
+            raise JobCancelled(context.job_id)
+        result['heuristic'] = name
+        results.append(result)
+        if context:
+            context.set_progress(i + 1, len(heuristics))
+
+    # Save results to CSV
+    if search is a_star_search:
+        log_to_csv(results, f"{grid.rows}x{grid.cols}", grid.wall_density)
+
+    return {'results': results}
+
+def run_race(data, context=None):
+    """
+    /compare with race=true: stop at the first heuristic whose path is
+    certified optimal. Partial runs are not logged to the CSV.
+    """
+    max_nodes, deadline_ms = get_budget(data, context)
+    return race_heuristics(
+        parse_grid(data), data['start'], data['goal'],
+        data.get('heuristics', ['manhattan']),
+        allow_diagonal=bool(data.get('allow_diagonal', False)),
+        mode=data.get('race_mode', 'interleave'),
+        max_nodes=max_nodes, deadline_ms=deadline_ms,
+        learn=bool(data.get('learn_order', False)), csv_path=CSV_FILE
+    )
+
+def run_experiment(data, context=None):
+    """Run every heuristic on a batch of random mazes (experiment sweep job)."""
+    num_mazes = int(data.get('num_mazes', 10))
+    size = int(data.get('size', 15))
+    obstacle_prob = float(data.get('obstacle_prob', 0.3))
+    allow_diagonal = bool(data.get('allow_diagonal', False))
+    names = data.get('heuristics') or list(HEURISTICS)
+
+    results = []
+    for maze_id in range(num_mazes):
+        if context:
+            context.check_cancelled()
+        maze = generate_random_maze(size, size, obstacle_prob)
+        for name in names:
+            result = run_single_experiment(maze, name, get_heuristic(name), allow_diagonal)
+            result['maze_id'] = maze_id
+            results.append(result)
+        if context:
+            context.set_progress(maze_id + 1, num_mazes)
+    return {'results': results}
+
+# --- JOB QUEUE ---
+# JOB_STORE: 'memory' (default) or the path of an SQLite file shared by all workers
+# JOB_WORKERS: worker processes per app process; handlers run there, off this GIL
+job_manager = JobManager(
+    {'solve': run_solve, 'compare': run_compare, 'experiment': run_experiment},
+    store=create_job_store(os.environ.get('JOB_STORE')),
+    num_workers=int(os.environ.get('JOB_WORKERS', 2)),
+    max_queued=int(os.environ.get('JOB_MAX_QUEUED', 100))
+)
+
+# --- DISTANCE FIELDS ---
+field_cache = DistanceFieldCache(int(os.environ.get('FLOW_FIELD_CACHE_MB', 256)) * 1024 * 1024)
+
+# --- DISTANCE MATRIX ---
+MAX_MATRIX_POINTS = int(os.environ.get('MAX_MATRIX_POINTS', 500))
+MATRIX_WORKERS = int(os.environ.get('MATRIX_WORKERS', 0)) or None
+
 @app.route('/', methods=['GET'])
 def index():
     return jsonify({'status': 'Heuristic Pathfinding API running', 'version': '1.0'})
@@ -44,44 +250,224 @@ def index():
 def generate():
     size = request.args.get('size', default=15, type=int)
     maze = generate_random_maze(size, size, 0.3)
-    maze['start'] = list(maze['start'])
-    maze['goal'] = list(maze['goal'])
-    return jsonify(maze)
+    return jsonify(maze.to_dict())
 
 @app.route('/solve', methods=['POST'])
 def solve():
     data = request.get_json()
-    grid, start, goal = data.get('grid'), data.get('start'), data.get('goal')
-    heuristic_name = data.get('heuristic', 'manhattan')
-    
-    if not grid or not start or not goal:
+    if not data.get('grid') or not data.get('start') or not data.get('goal'):
         return jsonify({'error': 'Missing data'}), 400
+    try:
+        parse_grid(data)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid grid: {e}'}), 400
+    try:
+        check_endpoints(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    result = a_star_search(grid, start, goal, get_heuristic(heuristic_name))
-    result['heuristic'] = heuristic_name
-    return jsonify(result)
+    try:
+        get_budget(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid budget: {e}'}), 400
+    try:
+        get_algorithm(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(run_solve(data))
 
 @app.route('/compare', methods=['POST'])
 def compare():
     data = request.get_json()
-    grid, start, goal = data.get('grid'), data.get('start'), data.get('goal')
-    heuristics = data.get('heuristics', ['manhattan'])
+    if not data.get('grid') or not data.get('start') or not data.get('goal'):
+        return jsonify({'error': 'Missing data'}), 400
+    try:
+        parse_grid(data)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid grid: {e}'}), 400
+    try:
+        check_endpoints(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        get_budget(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid budget: {e}'}), 400
+    try:
+        get_algorithm(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if data.get('race'):
+        if data.get('race_mode', 'interleave') not in ('interleave', 'parallel'):
+            return jsonify({'error': 'race_mode must be interleave or parallel'}), 400
+        return jsonify(run_race(data))
+
+    return jsonify(run_compare(data))
 
-    if not grid or not start or not goal:
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json()
+    kind = data.get('type')
+    params = data.get('params', {})
+
+    if kind in ('solve', 'compare') and (
+            not params.get('grid') or not params.get('start') or not params.get('goal')):
         return jsonify({'error': 'Missing data'}), 400
+    if kind in ('solve', 'compare'):
+        try:
+            check_endpoints(params)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        try:
+            get_budget(params, True)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid budget: {e}'}), 400
 
-    results = []
-    for name in heuristics:
-        h_func = get_heuristic(name)
-        if not h_func: continue
-        result = a_star_search(grid, start, goal, h_func)
-        result['heuristic'] = name
-        results.append(result)
+    try:
+        job = job_manager.submit(kind, params, data.get('priority', 0))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
 
-    # Save results to CSV
-    log_to_csv(results, f"{len(grid)}x{len(grid[0])}")
+    return jsonify({'job_id': job['id'], 'status': job['status']}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    del job['params']
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job_id': job['id'], 'status': job['status'],
+                    'cancel_requested': job['cancel_requested']})
+
+@app.route('/flow-field', methods=['POST'])
+def flow_field():
+    """
+    Compute (or reuse) the distance field towards 'goal' and answer the
+    optional list of 'starts' from it without running a new search.
+    """
+    data = request.get_json()
+    grid, goal = data.get('grid'), data.get('goal')
+    allow_diagonal = bool(data.get('allow_diagonal', False))
+
+    if not grid or not goal:
+        return jsonify({'error': 'Missing data'}), 400
+    try:
+        grid = Grid.from_any(grid)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid grid: {e}'}), 400
+    try:
+        check_cell(grid, goal, 'goal')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not grid.is_open(*goal):
+        return jsonify({'error': 'goal is on a wall'}), 400
+    starts = data.get('starts', [])
+    if not isinstance(starts, list):
+        return jsonify({'error': "'starts' must be a list of [row, col] cells"}), 400
+    try:
+        for start in starts:
+            check_cell(grid, start, 'start')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    start_time = time.time()
+    field_id, field = field_cache.get_or_compute(grid, goal, allow_diagonal)
+
+    paths = []
+    for start in starts:
+        path = path_from_field(field, start, allow_diagonal)
+        paths.append({
+            'start': start,
+            'success': bool(path),
+            'path': path,
+            'path_length': len(path),
+            'distance': float(field[start[0]][start[1]]) if path else None
+        })
+
+    reachable = field[field >= 0] if not allow_diagonal else field[field != float('inf')]
+    return jsonify({
+        'field_id': field_id,
+        'shape': list(field.shape),
+        'dtype': field.dtype.name,
+        'reachable_cells': int(reachable.size),
+        'max_distance': float(reachable.max()) if reachable.size else None,
+        'paths': paths,
+        'time_taken': time.time() - start_time
+    })
+
+@app.route('/flow-field/<field_id>', methods=['GET'])
+def download_flow_field(field_id):
+    """
+    Raw little-endian field (int32, -1 = unreachable; or float32, inf =
+    unreachable) in row-major order, ready for a JS typed array.
+    """
+    field = field_cache.get(field_id)
+    if field is None:
+        return jsonify({'error': 'Field not found, POST /flow-field first'}), 404
+    payload = field.astype(field.dtype.newbyteorder('<'), copy=False).tobytes()
+    return Response(payload, mimetype='application/octet-stream', headers={
+        'X-Field-Rows': str(field.shape[0]),
+        'X-Field-Cols': str(field.shape[1]),
+        'X-Field-Dtype': field.dtype.name,
+        'Access-Control-Expose-Headers': 'X-Field-Rows, X-Field-Cols, X-Field-Dtype'
+    })
+
+@app.route('/distance-matrix', methods=['POST'])
+def distance_matrix():
+    """
+    Pairwise shortest-path distances between 'points'. JSON by default
+    (null = unreachable); with format=binary the body is the NxN matrix as
+    little-endian float32, row-major, Infinity = unreachable.
+    """
+    data = request.get_json()
+    grid, points = data.get('grid'), data.get('points')
+    allow_diagonal = bool(data.get('allow_diagonal', False))
+    with_paths = bool(data.get('paths', False))
+    binary = data.get('format') == 'binary'
+
+    if not grid or not points:
+        return jsonify({'error': 'Missing data'}), 400
+    try:
+        grid = Grid.from_any(grid)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid grid: {e}'}), 400
+    if len(points) > MAX_MATRIX_POINTS:
+        return jsonify({'error': f'Too many points (max {MAX_MATRIX_POINTS})'}), 400
+    if binary and with_paths:
+        return jsonify({'error': 'Paths are only available in JSON format'}), 400
+
+    start_time = time.time()
+    try:
+        matrix, paths = compute_distance_matrix(grid, points, allow_diagonal, with_paths,
+                                                workers=MATRIX_WORKERS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if binary:
+        return Response(matrix.astype('<f4').tobytes(), mimetype='application/octet-stream',
+                        headers={'X-Matrix-Size': str(len(points)),
+                                 'Access-Control-Expose-Headers': 'X-Matrix-Size'})
 
-    return jsonify({'results': results})
+    response = {
+        'points': points,
+        'matrix': [[float(d) if d != float('inf') else None for d in row] for row in matrix],
+        'time_taken': time.time() - start_time
+    }
+    if with_paths:
+        response['paths'] = paths
+    return jsonify(response)
 
 @app.route('/download-csv', methods=['GET'])
 def download():
@@ -0,0 +1,98 @@
+# corridor_test.py
+"""
+Check corridor_search against a_star_search - same path lengths, valid paths
+
+Runs random start/goal pairs on carved mazes (with and without loops) and on
+random-obstacle mazes, so endpoints land on corridors, junctions and inside
+filled dead-end trees. Exits with status 1 on the first mismatch.
+"""
+
+import random
+import sys
+
+from algorithms import a_star_search
+from corridors import corridor_search
+from heuristics import manhattan_distance
+from utils import generate_carved_maze, generate_random_maze
+
+
+def check_path(grid, path, start, goal):
+    """Path starts and ends at the endpoints, moves one open cell at a time"""
+    if path[0] != list(start) or path[-1] != list(goal):
+        return "wrong endpoints"
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        if abs(r1 - r2) + abs(c1 - c2) != 1:
+            return f"jump from {[r1, c1]} to {[r2, c2]}"
+    if any(grid[r][c] for r, c in path):
+        return "path crosses a wall"
+    return None
+
+
+def compare_on_maze(maze, pairs):
+    """
+    Returns:
+        tuple: (queries checked, list of failure messages)
+    """
+    grid = maze.grid
+    open_cells = [(r, c) for r in range(grid.rows) for c in range(grid.cols) if not grid[r][c]]
+    if not open_cells:
+        return 0, []
+
+    failures = []
+    queries = [(maze.start, maze.goal)] + [
+        (random.choice(open_cells), random.choice(open_cells)) for _ in range(pairs)
+    ]
+    for start, goal in queries:
+        expected = a_star_search(grid, start, goal, manhattan_distance)
+        result = corridor_search(grid, start, goal)
+        where = f"{grid.rows}x{grid.cols} {list(start)} -> {list(goal)}"
+        if result['success'] != expected['success']:
+            failures.append(f"{where}: success {result['success']}, A* {expected['success']}")
+        elif result['success']:
+            if result['path_length'] != expected['path_length']:
+                failures.append(f"{where}: length {result['path_length']}, "
+                                f"A* {expected['path_length']}")
+            problem = check_path(grid, result['path'], start, goal)
+            if problem:
+                failures.append(f"{where}: {problem}")
+    return len(queries), failures
+
+
+def main():
+    random.seed(0)
+
+    print("\n" + "=" * 70)
+    print("CORRIDOR SEARCH vs A*")
+    print("=" * 70)
+    print(f"{'Maze type':<20} {'Mazes':<8} {'Queries':<10} {'Failures'}")
+    print("-" * 70)
+
+    suites = [
+        ('carved', lambda: generate_carved_maze(random.randint(3, 41))),
+        ('carved + loops', lambda: generate_carved_maze(random.randint(3, 41),
+                                                        random.randint(1, 40))),
+        ('random obstacles', lambda: generate_random_maze(random.randint(1, 25),
+                                                          random.randint(1, 25), 0.35)),
+    ]
+
+    all_failures = []
+    for name, make_maze in suites:
+        checked = 0
+        failures = []
+        for _ in range(60):
+            count, maze_failures = compare_on_maze(make_maze(), pairs=10)
+            checked += count
+            failures += maze_failures
+        print(f"{name:<20} {60:<8} {checked:<10} {len(failures)}")
+        all_failures += failures
+
+    print("=" * 70)
+    if all_failures:
+        for failure in all_failures[:20]:
+            print("❌ " + failure)
+        sys.exit(1)
+    print("✅ corridor_search matches A* path lengths on every query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Dead-end filling and corridor collapsing for carved mazes
+
+Mazes carved by a recursive backtracker are mostly one-cell corridors and
+dead ends, which A* walks one expansion at a time. This module
+preprocesses a grid once (4-direction moves only) and answers any number of
+start/goal queries on the result:
+
+1. Dead-end filling repeatedly removes open cells with at most one open
+   neighbour. Each removed cell remembers the neighbour it hung from, so the
+   removed cells form trees hanging off the surviving "core" (or whole trees
+   for loop-free mazes, where nothing survives). The fill does not depend on
+   the endpoints: a start or goal inside a filled tree is re-attached by
+   climbing its parent chain, which is exactly the branch a fill that kept
+   that endpoint would have left open.
+
+2. The core is collapsed into a graph whose nodes are junctions (3+ core
+   neighbours) and whose edges are the corridor chains between them,
+   weighted by length. Endpoints on a corridor are spliced into their chain
+   as temporary nodes for the query only.
+
+The search then runs A* over junctions, and the result is expanded back to
+a cell path with the same shape as a_star_search's.
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from algorithms import DEADLINE_CHECK_INTERVAL, a_star_search, budget_exhausted_result
+from maze import Grid
+
+
+class CorridorGraph:
+    """
+    Preprocessed form of one grid. Build it with CorridorGraph(grid) or get a
+    cached one with get_corridor_graph(grid).
+
+    Attributes:
+        parent: for filled cells, the neighbour the cell hung from (-1 = tree root)
+        filled: bytearray, 1 for cells removed by dead-end filling
+        chains: list of (u, v, cells) corridor chains between junctions u, v
+        adjacency: junction -> list of (neighbour, chain index, from pos, to pos)
+    """
+
+    def __init__(self, grid):
+        grid = Grid.from_any(grid)
+        self.rows, self.cols = grid.shape
+        self.open = bytearray((grid.array == 0).tobytes())
+        self._fill_dead_ends(grid.degrees())
+        self._collapse_corridors()
+
+    def _neighbours(self, idx):
+        r, c = divmod(idx, self.cols)
+        if r > 0:
+            yield idx - self.cols
+        if r < self.rows - 1:
+            yield idx + self.cols
+        if c > 0:
+            yield idx - 1
+        if c < self.cols - 1:
+            yield idx + 1
+
+    def _fill_dead_ends(self, degrees):
+        size = self.rows * self.cols
+        is_open = self.open
+        degree = degrees.ravel().tolist()
+
+        filled = bytearray(size)
+        parent = [-1] * size
+        dead_ends = (np.frombuffer(is_open, dtype=np.uint8) == 1) & (degrees.ravel() <= 1)
+        queue = deque(np.flatnonzero(dead_ends).tolist())
+        queued = bytearray(size)
+        for idx in queue:
+            queued[idx] = 1
+
+        while queue:
+            idx = queue.popleft()
+            filled[idx] = 1
+            for n in self._neighbours(idx):
+                if is_open[n] and not filled[n]:
+                    parent[idx] = n
+                    degree[n] -= 1
+                    if degree[n] <= 1 and not queued[n]:
+                        queued[n] = 1
+                        queue.append(n)
+
+        self.filled = filled
+        self.parent = parent
+        self.degree = degree
+        self.filled_cells = sum(filled)
+
+    def _collapse_corridors(self):
+        core = (np.frombuffer(self.open, dtype=np.uint8) == 1) & (np.frombuffer(self.filled, dtype=np.uint8) == 0)
+        is_core = bytearray(core.tobytes())
+        self.is_core = is_core
+        degree = self.degree
+        core_cells = np.flatnonzero(core).tolist()
+
+        junctions = [idx for idx in core_cells if degree[idx] >= 3]
+        self.chains = []
+        self.adjacency = {}
+        # Corridor cell -> (chain index, position along [u] + cells + [v])
+        self.chain_of = {}
+
+        def walk(u, first):
+            cells = []
+            prev, cur = u, first
+            while cur not in self.adjacency and degree[cur] == 2:
+                cells.append(cur)
+                nxt = [n for n in self._neighbours(cur) if is_core[n] and n != prev]
+                prev, cur = cur, nxt[0]
+            return cells, cur
+
+        def add_chains(u):
+            for first in self._neighbours(u):
+                if not is_core[first] or first in self.chain_of:
+                    continue
+                if first in self.adjacency and first < u:
+                    continue  # junction-junction edge, already added from first
+                cells, v = walk(u, first)
+                k = len(self.chains)
+                self.chains.append((u, v, cells))
+                for pos, cell in enumerate(cells, 1):
+                    self.chain_of[cell] = (k, pos)
+                end = len(cells) + 1
+                self.adjacency[u].append((v, k, 0, end))
+                self.adjacency[v].append((u, k, end, 0))
+
+        for u in junctions:
+            self.adjacency[u] = []
+        for u in junctions:
+            add_chains(u)
+
+        # Loops with no junction at all: promote one cell to a node
+        for idx in core_cells:
+            if idx not in self.adjacency and idx not in self.chain_of:
+                self.adjacency[idx] = []
+                add_chains(idx)
+
+    def chain_cells(self, k, start_pos, end_pos):
+        """Cells of chain k from position start_pos to end_pos inclusive"""
+        u, v, cells = self.chains[k]
+        seq = [u] + cells + [v]
+        if start_pos <= end_pos:
+            return seq[start_pos:end_pos + 1]
+        return seq[end_pos:start_pos + 1][::-1]
+
+    def climb(self, idx):
+        """Parent chain from idx up to the first core cell (or tree root)"""
+        chain = [idx]
+        while self.filled[chain[-1]] and self.parent[chain[-1]] != -1:
+            chain.append(self.parent[chain[-1]])
+        return chain
+
+
+def _splice(graph, node, extra):
+    """Add temporary edges joining a corridor cell to the ends of its chain"""
+    if node in graph.adjacency:
+        return
+    k, pos = graph.chain_of[node]
+    u, v, cells = graph.chains[k]
+    end = len(cells) + 1
+    extra[node] = [(u, k, pos, 0), (v, k, pos, end)]
+    for other, edges in list(extra.items()):
+        if other != node and graph.chain_of.get(other, (None,))[0] == k:
+            other_pos = graph.chain_of[other][1]
+            edges.append((node, k, other_pos, pos))
+            extra[node].append((other, k, pos, other_pos))
+    extra.setdefault(u, []).append((node, k, 0, pos))
+    extra.setdefault(v, []).append((node, k, end, pos))
+
+
+def corridor_search(grid, start, goal, heuristic_func=None, allow_diagonal=False,
+                    max_nodes=None, deadline_ms=None, should_stop=None):
+    """
+    Drop-in alternative to a_star_search that searches the cached corridor
+    graph. Only junctions count as explored nodes. The search always uses
+    Manhattan distance between junctions (heuristic_func is ignored), and
+    diagonal movement falls back to a_star_search. Raises ValueError if start
+    or goal is outside the grid.
+
+    Returns:
+        dict: same shape as a_star_search's result
+    """
+    if allow_diagonal:
+        return a_star_search(grid, start, goal, heuristic_func, True, max_nodes, deadline_ms,
+                             should_stop)
+
+    start_time = time.time()
+    deadline = start_time + deadline_ms / 1000.0 if deadline_ms is not None else None
+    graph = get_corridor_graph(grid)
+    cols = graph.cols
+    for name, (r, c) in (('start', start), ('goal', goal)):
+        # A flat index r * cols + c would silently wrap to another row
+        if not (0 <= r < graph.rows and 0 <= c < cols):
+            raise ValueError(f"{name} {[r, c]} is outside the {graph.rows}x{cols} grid")
+
+    def result(path, explored):
+        return {
+            'success': bool(path),
+            'budget_exhausted': False,
+            'path': path,
+            'explored': [list(divmod(n, cols)) for n in explored],
+            'nodes_explored': len(explored),
+            'path_length': len(path),
+            'time_taken': time.time() - start_time
+        }
+
+    s = int(start[0]) * cols + int(start[1])
+    g = int(goal[0]) * cols + int(goal[1])
+    if not graph.open[s] or not graph.open[g]:
+        return result([], [])
+
+    to_cells = lambda idxs: [list(divmod(n, cols)) for n in idxs]
+
+    # Climb out of the dead-end trees; they may meet before reaching the core
+    s_chain, g_chain = graph.climb(s), graph.climb(g)
+    s_pos = {cell: i for i, cell in enumerate(s_chain)}
+    for j, cell in enumerate(g_chain):
+        if cell in s_pos:
+            return result(to_cells(s_chain[:s_pos[cell] + 1] + g_chain[:j][::-1]), [])
+
+    cs, cg = s_chain[-1], g_chain[-1]
+    if not graph.is_core[cs] or not graph.is_core[cg]:
+        return result([], [])  # different components
+
+    extra = {}
+    _splice(graph, cs, extra)
+    _splice(graph, cg, extra)
+
+    goal_rc = divmod(cg, cols)
+    h = lambda n: abs(n // cols - goal_rc[0]) + abs(n % cols - goal_rc[1])
+
+    best = {cs: 0}
+    came_from = {cs: None}
+    closed = set()
+    explored = []
+    open_list = [(h(cs), 0, cs)]
+    last_check = -DEADLINE_CHECK_INTERVAL  # check before the first expansion too
+
+    def core_path(node):
+        cells = [node]
+        while came_from[node] is not None:
+            node, k, from_pos, to_pos = came_from[node]
+            cells[-1:] = graph.chain_cells(k, to_pos, from_pos)
+        return cells[::-1]
+
+    while open_list:
+        reason = None
+        expanded = len(explored)
+        if max_nodes is not None and expanded >= max_nodes:
+            reason = 'max_nodes'
+        elif expanded - last_check >= DEADLINE_CHECK_INTERVAL:
+            last_check = expanded
+            if deadline is not None and time.time() >= deadline:
+                reason = 'deadline'
+            elif should_stop is not None and should_stop(expanded):
+                reason = 'cancelled'
+        if reason:
+            nearest = min(explored, key=h) if explored else cs
+            return budget_exhausted_result(reason, to_cells(s_chain[:-1] + core_path(nearest)),
+                                           to_cells(explored), time.time() - start_time)
+
+        _, cost, node = heapq.heappop(open_list)
+        if node in closed:
+            continue
+        closed.add(node)
+        explored.append(node)
+
+        if node == cg:
+            path = s_chain[:-1] + core_path(cg) + g_chain[:-1][::-1]
+            return result(to_cells(path), explored)
+
+        edges = graph.adjacency.get(node, []) + extra.get(node, [])
+        for neighbour, k, from_pos, to_pos in edges:
+            new_cost = cost + abs(to_pos - from_pos)
+            if neighbour not in closed and new_cost < best.get(neighbour, float('inf')):
+                best[neighbour] = new_cost
+                came_from[neighbour] = (node, k, from_pos, to_pos)
+                heapq.heappush(open_list, (new_cost + h(neighbour), new_cost, neighbour))
+
+    return result([], explored)
+
+
+# --- CACHE ---
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 16
+
+
+def get_corridor_graph(grid):
+    """
+    Preprocessed graph for a grid, built once per distinct grid content and
+    reused for every start/goal pair on it
+    """
+    grid = Grid.from_any(grid)
+    key = grid.key
+    with _cache_lock:
+        graph = _cache.get(key)
+        if graph is not None:
+            _cache.move_to_end(key)
+            return graph
+    graph = CorridorGraph(grid)
+    with _cache_lock:
+        _cache[key] = graph
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return graph
@@ -0,0 +1,223 @@
+"""
+Many-to-many shortest-path distances between points on one maze
+
+Instead of one A* run per (source, target) pair, each source runs a single
+BFS (or Dijkstra with diagonals) that stops as soon as every target it
+still needs has been settled. Grid moves are symmetric, so source i only
+searches for points j > i and the matrix is mirrored. Sources are spread
+across processes because the searches are pure-Python and CPU-bound.
+"""
+
+import heapq
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from flowfield import DIAGONAL_COST, DIAGONAL_MOVES, STRAIGHT_MOVES
+from maze import Grid
+
+
+# Below this many points the process pool costs more than it saves
+PARALLEL_MIN_POINTS = 16
+
+# Grid shared with pool workers, set once per process by _init_worker
+_worker_grid = None
+
+
+def multi_target_search(walls, rows, cols, source, targets, allow_diagonal=False,
+                        with_paths=False):
+    """
+    Search outward from one source until all targets are settled
+
+    Args:
+        walls: flat sequence, non-zero = wall, row-major
+        rows, cols: grid shape
+        source: flat index of the source cell
+        targets: iterable of flat target indices
+        allow_diagonal: 8-direction moves costing DIAGONAL_COST
+        with_paths: also return the path to each target
+
+    Returns:
+        dict: target index -> (distance, path); unreachable targets are
+              absent, path is None unless with_paths
+    """
+    remaining = set(targets)
+    found = {}
+    if walls[source]:
+        return found
+
+    parent = [-1] * (rows * cols) if with_paths else None
+
+    def settle(idx, d):
+        remaining.discard(idx)
+        found[idx] = (d, _trace(parent, idx, cols) if with_paths else None)
+
+    if source in remaining:
+        settle(source, 0)
+
+    moves = [(dr, dc, 1) for dr, dc in STRAIGHT_MOVES]
+    if allow_diagonal:
+        moves += [(dr, dc, DIAGONAL_COST) for dr, dc in DIAGONAL_MOVES]
+
+    if not allow_diagonal:
+        # BFS: a cell's distance is final the first time it is reached
+        dist = [-1] * (rows * cols)
+        dist[source] = 0
+        queue = deque([source])
+        while queue and remaining:
+            idx = queue.popleft()
+            r, c = divmod(idx, cols)
+            d = dist[idx] + 1
+            for dr, dc, _ in moves:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    n = nr * cols + nc
+                    if dist[n] == -1 and not walls[n]:
+                        dist[n] = d
+                        if with_paths:
+                            parent[n] = idx
+                        if n in remaining:
+                            settle(n, d)
+                        queue.append(n)
+        return found
+
+    # Dijkstra: a cell's distance is final when it is popped
+    inf = float('inf')
+    dist = [inf] * (rows * cols)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap and remaining:
+        d, idx = heapq.heappop(heap)
+        if d > dist[idx]:
+            continue
+        if idx in remaining:
+            settle(idx, d)
+        r, c = divmod(idx, cols)
+        for dr, dc, cost in moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                n = nr * cols + nc
+                nd = d + cost
+                if nd < dist[n] and not walls[n]:
+                    dist[n] = nd
+                    if with_paths:
+                        parent[n] = idx
+                    heapq.heappush(heap, (nd, n))
+    return found
+
+
+def _trace(parent, idx, cols):
+    path = []
+    while idx != -1:
+        path.append(list(divmod(idx, cols)))
+        idx = parent[idx]
+    return path[::-1]
+
+
+def _init_worker(walls, rows, cols):
+    global _worker_grid
+    _worker_grid = (walls, rows, cols)
+
+
+def _search_sources(task):
+    """Pool task: run the searches for a batch of (source_i, source, targets)"""
+    jobs, allow_diagonal, with_paths = task
+    walls, rows, cols = _worker_grid
+    return [(i, multi_target_search(walls, rows, cols, source, targets,
+                                    allow_diagonal, with_paths))
+            for i, source, targets in jobs]
+
+
+def compute_distance_matrix(grid, points, allow_diagonal=False, with_paths=False,
+                            workers=None):
+    """
+    Shortest-path distance between every pair of points
+
+    Args:
+        grid: Grid, 2D list or numpy array where 0=walkable, 1=wall
+        points: list of integer (row, col); points on walls are unreachable
+        allow_diagonal: 8-direction moves costing DIAGONAL_COST
+        with_paths: also return paths[i][j] as lists of [row, col]
+        workers: number of processes (None = CPU count, 1 = no pool)
+
+    Returns:
+        tuple: (matrix, paths) where matrix is an NxN float64 numpy array
+               with inf for unreachable pairs and paths is None unless
+               with_paths
+    """
+    grid = Grid.from_any(grid)
+    rows, cols = grid.shape
+    walls = bytes(grid.cells)
+
+    flat = []
+    for point in points:
+        if not isinstance(point, (list, tuple)) or len(point) != 2 or \
+                not all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in point):
+            raise ValueError(f"Point {point!r} must be [row, col] integers")
+        r, c = int(point[0]), int(point[1])
+        if not (0 <= r < rows and 0 <= c < cols):
+            raise ValueError(f"Point {[r, c]} is outside the {rows}x{cols} grid")
+        flat.append(r * cols + c)
+
+    n = len(flat)
+    matrix = np.full((n, n), np.inf)
+    paths = [[None] * n for _ in range(n)] if with_paths else None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, n)
+
+    def run(jobs):
+        """Searches for (source_i, source, targets) jobs, in the pool when worthwhile"""
+        if workers <= 1 or len(jobs) < PARALLEL_MIN_POINTS:
+            return [[(i, multi_target_search(walls, rows, cols, source, targets,
+                                             allow_diagonal, with_paths))
+                     for i, source, targets in jobs]]
+        # Interleave sources so every batch mixes long and short target lists
+        tasks = [(jobs[k::workers * 4], allow_diagonal, with_paths)
+                 for k in range(workers * 4)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(walls, rows, cols)) as pool:
+            return list(pool.map(_search_sources, tasks))
+
+    # Source i only needs the points after it; the rest come from symmetry
+    groups = [list(range(n))]
+    batches = []
+    if not allow_diagonal and n > 1:
+        # A search with an unreachable target runs until its whole component
+        # is exhausted. The first point of a group searches for the whole
+        # group; if some stay unsettled, the settled ones share its component
+        # and the rest are split off into a new group, searched the same
+        # way. Every other source then only looks inside its own group.
+        # Diagonal moves can cut between 4-connected components, so this
+        # only applies without them.
+        groups, pending = [], list(range(n))
+        while pending:
+            i = pending[0]
+            found = multi_target_search(walls, rows, cols, flat[i],
+                                        {flat[j] for j in pending}, allow_diagonal, with_paths)
+            batches.append([(i, found)])
+            groups.append([j for j in pending[1:] if flat[j] in found])
+            pending = [j for j in pending[1:] if flat[j] not in found]
+
+    jobs = [(i, flat[i], {flat[j] for j in group if j >= i})
+            for group in groups for i in group]
+    batches += run(jobs)
+
+    index_of = {}
+    for j, idx in enumerate(flat):
+        index_of.setdefault(idx, []).append(j)
+
+    for batch in batches:
+        for i, found in batch:
+            for target, (d, path) in found.items():
+                for j in index_of[target]:
+                    if j < i:
+                        continue
+                    matrix[i, j] = matrix[j, i] = d
+                    if with_paths:
+                        paths[i][j] = path
+                        paths[j][i] = path[::-1]
+    return matrix, paths
@@ -20,7 +20,7 @@ def run_single_experiment(maze, heuristic_name, heuristic_func, allow_diagonal=F
     Returns:
         dict: experiment results
     """
-    result = a_star_search(maze, heuristic_func, allow_diagonal)
+    result = a_star_search(maze.grid, maze.start, maze.goal, heuristic_func, allow_diagonal)
     
     return {
         'heuristic': heuristic_name,
@@ -0,0 +1,168 @@
+"""
+Reverse distance fields ("flow fields") for one-goal, many-start queries
+
+A distance field stores, for every cell, the shortest-path distance to the
+goal. It is computed once with a search outward from the goal (the
+vectorised wavefront BFS for unit costs, Dijkstra when diagonal moves are
+allowed), after which the path from any start is found by walking downhill
+in O(path length).
+"""
+
+import heapq
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from maze import Grid
+from wavefront import DIAGONAL_MOVES, STRAIGHT_MOVES, wavefront_distances
+
+
+DIAGONAL_COST = 1.414  # matches algorithms.a_star_search
+
+UNREACHABLE_INT = -1
+
+
+def compute_distance_field(grid, goal, allow_diagonal=False):
+    """
+    Compute the shortest distance from every cell to the goal
+
+    Args:
+        grid: 2D list or numpy array where 0=walkable, 1=wall
+        goal: (row, col)
+        allow_diagonal: if True, use 8-direction moves costing DIAGONAL_COST
+
+    Returns:
+        numpy array: int32 with UNREACHABLE_INT for unreachable/wall cells
+                     (4-direction), or float32 with inf (8-direction)
+    """
+    cells = np.asarray(grid, dtype=np.uint8)
+    rows, cols = cells.shape
+
+    if not allow_diagonal:
+        if cells[goal[0], goal[1]]:
+            return np.full((rows, cols), UNREACHABLE_INT, dtype=np.int32)
+        return wavefront_distances(cells, goal)
+
+    dist = _dijkstra(cells.ravel().tolist(), rows, cols, goal[0] * cols + goal[1])
+    return np.array(dist, dtype=np.float32).reshape(rows, cols)
+
+
+def _dijkstra(walls, rows, cols, goal_idx):
+    inf = float('inf')
+    dist = [inf] * (rows * cols)
+    if walls[goal_idx]:
+        return dist
+    dist[goal_idx] = 0.0
+    moves = [(dr, dc, 1) for dr, dc in STRAIGHT_MOVES]
+    moves += [(dr, dc, DIAGONAL_COST) for dr, dc in DIAGONAL_MOVES]
+    heap = [(0.0, goal_idx)]
+    while heap:
+        d, idx = heapq.heappop(heap)
+        if d > dist[idx]:
+            continue
+        r, c = divmod(idx, cols)
+        for dr, dc, cost in moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                n = nr * cols + nc
+                nd = d + cost
+                if nd < dist[n] and not walls[n]:
+                    dist[n] = nd
+                    heapq.heappush(heap, (nd, n))
+    return dist
+
+
+def path_from_field(field, start, allow_diagonal=False):
+    """
+    Follow a distance field downhill from start to the goal
+
+    Args:
+        field: array returned by compute_distance_field
+        start: (row, col)
+        allow_diagonal: must match the value the field was computed with
+
+    Returns:
+        list: path as [row, col] pairs from start to goal, or [] if the
+              start cannot reach the goal
+    """
+    rows, cols = field.shape
+    r, c = int(start[0]), int(start[1])
+    if not (0 <= r < rows and 0 <= c < cols) or not _reachable(field[r, c]):
+        return []
+
+    moves = [(dr, dc, 1) for dr, dc in STRAIGHT_MOVES]
+    if allow_diagonal:
+        moves += [(dr, dc, DIAGONAL_COST) for dr, dc in DIAGONAL_MOVES]
+
+    path = [[r, c]]
+    current = float(field[r, c])
+    while current > 0:
+        # Step to the neighbour that minimises move cost + remaining distance;
+        # on a shortest-path field that total equals the current distance
+        best = None
+        for dr, dc, cost in moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                value = field[nr, nc]
+                if _reachable(value) and (best is None or value + cost < best[3]):
+                    best = (nr, nc, float(value), value + cost)
+        if best is None or best[2] >= current:
+            return []  # no way downhill: the field has no goal at distance 0
+        r, c, current, _ = best
+        path.append([r, c])
+    return path
+
+
+def _reachable(value):
+    return value != UNREACHABLE_INT and np.isfinite(value)
+
+
+class DistanceFieldCache:
+    """
+    LRU cache of distance fields keyed by (grid, goal, allow_diagonal),
+    bounded by the total size of the stored arrays.
+
+    Args:
+        max_bytes: memory budget for cached fields
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._fields = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def field_id(key, goal, allow_diagonal):
+        return f"{key}-{int(goal[0])}-{int(goal[1])}-{'d' if allow_diagonal else 's'}"
+
+    def get(self, field_id):
+        with self._lock:
+            field = self._fields.get(field_id)
+            if field is not None:
+                self._fields.move_to_end(field_id)
+            return field
+
+    def get_or_compute(self, grid, goal, allow_diagonal=False):
+        """
+        Returns:
+            tuple: (field_id, field)
+        """
+        grid = Grid.from_any(grid)
+        field_id = self.field_id(grid.key, goal, allow_diagonal)
+        field = self.get(field_id)
+        if field is None:
+            field = compute_distance_field(grid, goal, allow_diagonal)
+            self._put(field_id, field)
+        return field_id, field
+
+    def _put(self, field_id, field):
+        with self._lock:
+            if field_id in self._fields:
+                return
+            self._fields[field_id] = field
+            self._bytes += field.nbytes
+            while self._bytes > self.max_bytes and len(self._fields) > 1:
+                _, evicted = self._fields.popitem(last=False)
+                self._bytes -= evicted.nbytes
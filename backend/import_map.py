@@ -0,0 +1,111 @@
+"""
+Convert occupancy images (PGM or PNG) into the tiled grid format
+
+Usage:
+    python import_map.py map.pgm map.tgrid [--tile-size 256] [--free-threshold 220] [--invert]
+
+Pixels at or above the free threshold are walkable, everything else
+(occupied and "unknown" grey) becomes a wall; --invert flips this for maps
+that draw obstacles in white.
+
+Binary PGM (P5) is read through a memory map one band of rows at a time, so
+maps larger than RAM convert fine. PNG needs Pillow (pip install Pillow),
+which decodes the whole image in memory; convert very large PNGs to PGM
+first.
+"""
+
+import argparse
+import re
+
+import numpy as np
+
+from tiled_grid import DEFAULT_TILE_SIZE, write_tiled_grid
+
+
+DEFAULT_FREE_THRESHOLD = 220
+
+
+def _read_pgm_header(path):
+    """
+    Returns:
+        tuple: (width, height, maxval, data_offset)
+    """
+    with open(path, 'rb') as f:
+        head = f.read(1024)
+    # Magic, width, height and maxval, separated by whitespace and comments,
+    # followed by exactly one whitespace byte before the pixel data
+    match = re.match(rb'P5(?:\s+|#[^\n]*\n)+(\d+)(?:\s+|#[^\n]*\n)+(\d+)'
+                     rb'(?:\s+|#[^\n]*\n)+(\d+)\s', head)
+    if not match:
+        raise ValueError(f"{path} is not a binary (P5) PGM file")
+    width, height, maxval = (int(g) for g in match.groups())
+    return width, height, maxval, match.end()
+
+
+def pgm_bands(path, band_rows):
+    """
+    Stream a binary PGM as bands of pixel rows
+
+    Returns:
+        tuple: (height, width, maxval, iterator of 2D arrays)
+    """
+    width, height, maxval, offset = _read_pgm_header(path)
+    dtype = np.uint8 if maxval < 256 else np.dtype('>u2')
+    pixels = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(height, width))
+    bands = (pixels[r:r + band_rows] for r in range(0, height, band_rows))
+    return height, width, maxval, bands
+
+
+def png_bands(path, band_rows):
+    """Load a PNG with Pillow and split it into bands of grayscale rows"""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise ImportError("Reading PNG maps requires Pillow (pip install Pillow); "
+                          "alternatively convert the image to PGM")
+    image = Image.open(path).convert('L')
+    pixels = np.asarray(image)
+    height, width = pixels.shape
+    bands = (pixels[r:r + band_rows] for r in range(0, height, band_rows))
+    return height, width, 255, bands
+
+
+def import_map(src, dst, tile_size=DEFAULT_TILE_SIZE,
+               free_threshold=DEFAULT_FREE_THRESHOLD, invert=False):
+    """
+    Convert an occupancy image into a tiled grid file
+
+    Args:
+        src: .pgm or .png occupancy image
+        dst: output tiled grid path
+        tile_size: tile edge length in cells
+        free_threshold: 8-bit pixel value at or above which a cell is walkable
+        invert: treat bright pixels as walls instead
+
+    Returns:
+        tuple: (rows, cols)
+    """
+    reader = png_bands if src.lower().endswith('.png') else pgm_bands
+    rows, cols, maxval, bands = reader(src, tile_size)
+    threshold = free_threshold * maxval / 255
+
+    def walls(band):
+        free = band >= threshold
+        return free if invert else ~free
+
+    write_tiled_grid(dst, rows, cols, (walls(band) for band in bands), tile_size)
+    return rows, cols
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a PGM/PNG occupancy map to a tiled grid")
+    parser.add_argument('src', help="input .pgm or .png image")
+    parser.add_argument('dst', help="output tiled grid file")
+    parser.add_argument('--tile-size', type=int, default=DEFAULT_TILE_SIZE)
+    parser.add_argument('--free-threshold', type=int, default=DEFAULT_FREE_THRESHOLD,
+                        help="pixel value (0-255) at or above which a cell is walkable")
+    parser.add_argument('--invert', action='store_true', help="bright pixels are walls")
+    args = parser.parse_args()
+
+    rows, cols = import_map(args.src, args.dst, args.tile_size, args.free_threshold, args.invert)
+    print(f"✅ Wrote {rows}x{cols} grid to {args.dst}")
@@ -0,0 +1,605 @@
+"""
+Background job queue for long-running solves, comparisons and experiment sweeps
+
+Jobs are submitted with a kind (e.g. 'solve', 'compare', 'experiment'), a
+params dict and a priority, and are executed by a small pool of worker
+processes, so CPU-bound searches never hold the GIL of the process serving
+requests. Job state lives in a store that doubles as the broker:
+
+    MemoryJobStore  - in-process, lost on restart, one process only
+    SQLiteJobStore  - file-backed, shared by every process that opens the
+                      same database (use this when running several gunicorn
+                      workers, otherwise GET /jobs/<id> may hit a process that
+                      never saw the job). Running jobs hold a lease that
+                      their worker renews; a job whose process died is
+                      requeued once, then failed.
+"""
+
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job has been cancelled"""
+
+
+def _new_job(kind, params, priority):
+    return {
+        'id': uuid.uuid4().hex,
+        'kind': kind,
+        'params': params,
+        'priority': priority,
+        'status': QUEUED,
+        'progress': 0.0,
+        'result': None,
+        'error': None,
+        'cancel_requested': False,
+        'created': time.time(),
+        'started': None,
+        'finished': None,
+    }
+
+
+class MemoryJobStore:
+    """
+    In-process job store. Queued jobs are kept in a heap ordered by
+    priority (higher first), then submission order.
+    """
+
+    def __init__(self, result_ttl=3600):
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def add(self, job, max_queued):
+        with self._cond:
+            self._prune()
+            if self.count_queued() >= max_queued:
+                raise JobQueueFull(f"Job queue is full ({max_queued} queued)")
+            self._jobs[job['id']] = dict(job)
+            heapq.heappush(self._heap, (-job['priority'], next(self._counter), job['id']))
+            self._cond.notify()
+
+    def claim(self, timeout=1.0):
+        """Pop the next queued job and mark it running, or return None"""
+        with self._cond:
+            deadline = time.time() + timeout
+            while True:
+                while self._heap:
+                    _, _, job_id = heapq.heappop(self._heap)
+                    job = self._jobs.get(job_id)
+                    if job and job['status'] == QUEUED:
+                        job['status'] = RUNNING
+                        job['started'] = time.time()
+                        return dict(job)
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id, **fields):
+        with self._cond:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. Queued jobs are cancelled immediately, running jobs are
+        flagged and stop at their next checkpoint.
+
+        Returns:
+            dict: the job after the request, or None if unknown
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] == QUEUED:
+                job['status'] = CANCELLED
+                job['finished'] = time.time()
+            elif job['status'] == RUNNING:
+                job['cancel_requested'] = True
+            return dict(job)
+
+    def heartbeat(self, job_id):
+        """Jobs die with the process holding this store, so there is no lease to renew"""
+
+    def is_cancel_requested(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return bool(job and job['cancel_requested'])
+
+    def count_queued(self):
+        return sum(1 for job in self._jobs.values() if job['status'] == QUEUED)
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job['status'] in FINISHED_STATES and job['finished'] < cutoff]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """
+    SQLite-backed job store. Every process pointing at the same file shares
+    the queue, so it stands in for an external broker. Workers poll for new
+    jobs instead of being notified.
+
+    A claimed job is leased for LEASE_SECONDS and the worker running it
+    renews the lease with heartbeat(). If the lease runs out (the process
+    was killed or recycled mid-job), the next claim() requeues the job, or
+    fails it once it has been started MAX_ATTEMPTS times.
+    """
+
+    POLL_INTERVAL = 0.2
+    LEASE_SECONDS = 30
+    MAX_ATTEMPTS = 2
+
+    def __init__(self, path, result_ttl=3600):
+        self.path = path
+        self.result_ttl = result_ttl
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT UNIQUE NOT NULL,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if 'lease_expires' not in columns:
+                # Databases from before leases: running jobs get one lease to be renewed
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires REAL")
+                conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+                conn.execute("UPDATE jobs SET lease_expires = ? WHERE status = ?",
+                             (time.time() + self.LEASE_SECONDS, RUNNING))
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority DESC, seq)"
+            )
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row):
+        job = dict(row)
+        del job['seq'], job['lease_expires'], job['attempts']
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        return job
+
+    def add(self, job, max_queued):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished < ?",
+                FINISHED_STATES + (time.time() - self.result_ttl,)
+            )
+            queued = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+            if queued >= max_queued:
+                conn.execute("ROLLBACK")
+                raise JobQueueFull(f"Job queue is full ({max_queued} queued)")
+            conn.execute(
+                """INSERT INTO jobs (id, kind, params, priority, status, progress,
+                                     result, error, cancel_requested, created)
+                   VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, 0, ?)""",
+                (job['id'], job['kind'], json.dumps(job['params']), job['priority'],
+                 job['status'], job['progress'], job['created'])
+            )
+            conn.execute("COMMIT")
+
+    def _expire_leases(self, conn, now):
+        """Requeue or finish running jobs whose worker stopped renewing the lease"""
+        expired = "status = ? AND lease_expires < ?"
+        conn.execute(
+            f"UPDATE jobs SET status = ?, finished = ? WHERE {expired} AND cancel_requested = 1",
+            (CANCELLED, now, RUNNING, now)
+        )
+        conn.execute(
+            f"UPDATE jobs SET status = ?, error = ?, finished = ? WHERE {expired} AND attempts >= ?",
+            (FAILED, 'Worker stopped while running the job', now, RUNNING, now, self.MAX_ATTEMPTS)
+        )
+        conn.execute(
+            f"""UPDATE jobs SET status = ?, progress = 0, started = NULL, lease_expires = NULL
+                WHERE {expired}""",
+            (QUEUED, RUNNING, now)
+        )
+
+    def claim(self, timeout=1.0):
+        deadline = time.time() + timeout
+        while True:
+            with self._connect() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._expire_leases(conn, time.time())
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC, seq LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    started = time.time()
+                    conn.execute(
+                        """UPDATE jobs SET status = ?, started = ?, lease_expires = ?,
+                                           attempts = attempts + 1 WHERE id = ?""",
+                        (RUNNING, started, started + self.LEASE_SECONDS, row['id'])
+                    )
+                    conn.execute("COMMIT")
+                    job = self._row_to_job(row)
+                    job['status'] = RUNNING
+                    job['started'] = started
+                    return job
+                conn.execute("COMMIT")
+            if time.time() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id, **fields):
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        columns = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?",
+                         tuple(fields.values()) + (job_id,))
+
+    def heartbeat(self, job_id):
+        """Extend the lease of a running job"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = ?",
+                         (time.time() + self.LEASE_SECONDS, job_id, RUNNING))
+
+    def cancel(self, job_id):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING)
+            )
+            conn.execute("COMMIT")
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def count_queued(self):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+
+
+class JobContext:
+    """Handle passed to a job handler for reporting progress and checking cancellation"""
+
+    # Store lookups per second made by a search's should_stop callback
+    STOP_CHECK_INTERVAL = 0.2
+
+    def __init__(self, store, job_id):
+        self.store = store
+        self.job_id = job_id
+
+    def set_progress(self, done, total):
+        """Record progress as a fraction of done/total units of work"""
+        self.store.update(self.job_id, progress=min(done / total, 1.0) if total else 1.0)
+
+    def is_cancelled(self):
+        return self.store.is_cancel_requested(self.job_id)
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled"""
+        if self.is_cancelled():
+            raise JobCancelled(self.job_id)
+
+    def stop_check(self, work, done=0, total=1):
+        """
+        should_stop callback for a search running inside this job
+
+        The search calls it with its count of work done so far (e.g. nodes
+        expanded). At most every STOP_CHECK_INTERVAL seconds it records progress as
+        step `done` of `total` plus count/work of the current step, and
+        checks whether the job has been cancelled.
+
+        Returns:
+            callable(count) -> True once the job is cancelled
+        """
+        last = [0.0]
+
+        def should_stop(count):
+            now = time.time()
+            if now - last[0] < self.STOP_CHECK_INTERVAL:
+                return False
+            last[0] = now
+            self.set_progress(done + min(count / work, 1.0) if work else done, total)
+            return self.is_cancelled()
+        return should_stop
+
+
+class _PipeStore:
+    """
+    Stand-in store for a JobContext inside a worker process: updates are
+    sent to the parent, which writes them to the real store, and the
+    cancel flag is an Event the parent sets
+    """
+
+    def __init__(self, conn, cancel_event):
+        self.conn = conn
+        self.cancel_event = cancel_event
+
+    def update(self, job_id, **fields):
+        self.conn.send(('update', fields))
+
+    def is_cancel_requested(self, job_id):
+        return self.cancel_event.is_set()
+
+
+def _process_main(handlers, conn, cancel_event):
+    """Worker process: run (job_id, kind, params) messages until told to stop"""
+    if hasattr(os, 'nice'):
+        # Searches are background work; requests in the parent go first
+        os.nice(10)
+    store = _PipeStore(conn, cancel_event)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        job_id, kind, params = message
+        context = JobContext(store, job_id)
+        try:
+            context.check_cancelled()
+            reply = (DONE, handlers[kind](params, context))
+        except JobCancelled:
+            reply = (CANCELLED, None)
+        except Exception as exc:
+            reply = (FAILED, str(exc))
+        conn.send(reply)
+
+
+class _WorkerProcess:
+    """One worker process, started on first use and restarted if it dies"""
+
+    def __init__(self, context, handlers):
+        self.context = context
+        self.handlers = handlers
+        self.process = None
+        self.conn = None
+        self.cancel_event = None
+
+    def send(self, message):
+        if self.process is None or not self.process.is_alive():
+            self.close()
+            self.conn, child_conn = self.context.Pipe()
+            self.cancel_event = self.context.Event()
+            process = self.context.Process(
+                target=_process_main, args=(self.handlers, child_conn, self.cancel_event),
+                daemon=True
+            )
+            try:
+                process.start()
+            finally:
+                child_conn.close()
+            self.process = process
+        self.cancel_event.clear()
+        self.conn.send(message)
+
+    def close(self, timeout=None):
+        if self.process is None:
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+
+class JobManager:
+    """
+    Runs queued jobs in a pool of worker processes.
+
+    Each worker process is driven by a thread in this process that claims
+    jobs from the store, forwards progress updates and cancellation, and
+    renews the job's lease. Handlers must be picklable (module-level
+    functions), as the processes are spawned rather than forked.
+
+    Args:
+        handlers: dict mapping job kind to a function(params, context) -> result
+        store: MemoryJobStore or SQLiteJobStore
+        num_workers: number of worker processes
+        max_queued: maximum number of queued (not yet running) jobs
+    """
+
+    POLL_INTERVAL = 0.2
+    HEARTBEAT_INTERVAL = 5
+
+    def __init__(self, handlers, store=None, num_workers=2, max_queued=100):
+        self.handlers = handlers
+        self.store = store if store is not None else MemoryJobStore()
+        self.num_workers = num_workers
+        self.max_queued = max_queued
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._mp_context = multiprocessing.get_context('spawn')
+
+    def start(self):
+        """Start the worker threads (idempotent); their processes start with the first job"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.num_workers):
+                thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Signal the workers to exit once their current job is finished"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind, params, priority=0):
+        """
+        Enqueue a job
+
+        Args:
+            kind: job kind, must be one of the registered handlers
+            params: JSON-serialisable dict passed to the handler
+            priority: int, higher runs first
+
+        Returns:
+            dict: the new job
+
+        Raises:
+            ValueError: unknown job kind
+            JobQueueFull: too many jobs already queued
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job type '{kind}'")
+        job = _new_job(kind, params, int(priority))
+        self.store.add(job, self.max_queued)
+        self.start()
+        return job
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def cancel(self, job_id):
+        return self.store.cancel(job_id)
+
+    def _worker_loop(self):
+        worker = _WorkerProcess(self._mp_context, self.handlers)
+        try:
+            while not self._stop.is_set():
+                job = self.store.claim(timeout=1.0)
+                if job is not None:
+                    self._run(worker, job)
+        finally:
+            worker.close(timeout=5)
+
+    def _run(self, worker, job):
+        job_id = job['id']
+        try:
+            worker.send((job_id, job['kind'], job['params']))
+        except Exception as exc:
+            self.store.update(job_id, status=FAILED, error=f"Could not start worker: {exc}",
+                              finished=time.time())
+            return
+        last_check = last_heartbeat = time.time()
+        while True:
+            try:
+                if worker.conn.poll(self.POLL_INTERVAL):
+                    status, value = worker.conn.recv()
+                    if status != 'update':
+                        break
+                    self.store.update(job_id, **value)
+            except (EOFError, OSError):
+                status, value = FAILED, 'Worker process exited while running the job'
+                worker.close()
+                break
+            now = time.time()
+            if now - last_check >= self.POLL_INTERVAL:
+                last_check = now
+                if self.store.is_cancel_requested(job_id):
+                    worker.cancel_event.set()
+            if now - last_heartbeat >= self.HEARTBEAT_INTERVAL:
+                last_heartbeat = now
+                self.store.heartbeat(job_id)
+
+        if status == DONE:
+            self.store.update(job_id, status=DONE, progress=1.0, result=value,
+                              finished=time.time())
+        elif status == CANCELLED:
+            self.store.update(job_id, status=CANCELLED, finished=time.time())
+        else:
+            self.store.update(job_id, status=FAILED, error=value, finished=time.time())
+
+
+def create_job_store(spec=None, result_ttl=3600):
+    """
+    Build a job store from a spec string
+
+    Args:
+        spec: None/'' or 'memory' for an in-process store, otherwise the path
+              of an SQLite database file
+
+    Returns:
+        MemoryJobStore or SQLiteJobStore
+    """
+    if not spec or spec == 'memory':
+        return MemoryJobStore(result_ttl)
+    directory = os.path.dirname(spec)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return SQLiteJobStore(spec, result_ttl)
@@ -0,0 +1,224 @@
+# jobs_test.py
+"""
+Check the job queue on both stores - ordering, cancellation, failures,
+exactly-once delivery when several managers share one SQLite file (as
+several gunicorn workers would) and recovery of jobs whose worker died.
+Exits with status 1 on any failure.
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import time
+import uuid
+
+from jobs import (CANCELLED, DONE, FAILED, RUNNING, JobManager, JobQueueFull,
+                  MemoryJobStore, SQLiteJobStore, _new_job)
+
+WAIT_TIMEOUT_S = 20
+
+
+def wait_for(manager, job_id, states):
+    """Poll until the job reaches one of states; returns the job"""
+    deadline = time.time() + WAIT_TIMEOUT_S
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in states:
+            return job
+        time.sleep(0.02)
+    raise TimeoutError(f"job {job_id} stuck in {job['status']}")
+
+
+# Handlers run in spawned worker processes, so they are module-level and
+# report back through files rather than shared memory
+def record(params, context):
+    with open(params['log'], 'a') as f:
+        f.write(f"{params['n']}\n")
+    return {'n': params['n']}
+
+
+def block(params, context):
+    deadline = time.time() + WAIT_TIMEOUT_S
+    while not os.path.exists(params['release']) and time.time() < deadline:
+        time.sleep(0.01)
+    return {}
+
+
+def spin(params, context):
+    # Long-running job that only stops when cancelled
+    for done in range(10 ** 6):
+        context.check_cancelled()
+        context.set_progress(done, 10 ** 6)
+        time.sleep(0.01)
+    return {}
+
+
+def fail(params, context):
+    raise RuntimeError("boom")
+
+
+HANDLERS = {'record': record, 'block': block, 'spin': spin, 'fail': fail}
+
+
+def read_log(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [int(line) for line in f]
+
+
+def check_store(make_store, tmp_dir):
+    """
+    Returns:
+        list: failure messages
+    """
+    failures = []
+    log = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.log")
+    release = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.release")
+    manager = JobManager(HANDLERS, make_store(), num_workers=1, max_queued=3)
+    try:
+        # Priority: with the only worker busy, the high-priority job jumps the queue
+        blocker = manager.submit('block', {'release': release})
+        wait_for(manager, blocker['id'], {RUNNING})
+        low = [manager.submit('record', {'n': n, 'log': log}) for n in (1, 2)]
+        high = manager.submit('record', {'n': 3, 'log': log}, priority=5)
+        try:
+            manager.submit('record', {'n': 4, 'log': log})
+            failures.append("fourth queued job was accepted with max_queued=3")
+        except JobQueueFull:
+            pass
+        # A queued job that is cancelled never runs
+        cancelled = manager.cancel(low[1]['id'])
+        if cancelled['status'] != CANCELLED:
+            failures.append(f"cancelled queued job is {cancelled['status']}")
+        open(release, 'w').close()
+        for job in [blocker, low[0], high]:
+            wait_for(manager, job['id'], {DONE})
+        if read_log(log) != [3, 1]:
+            failures.append(f"jobs ran in order {read_log(log)}, expected [3, 1]")
+
+        # A running job stops once cancelled, with progress reported meanwhile
+        running = manager.submit('spin', {})
+        wait_for(manager, running['id'], {RUNNING})
+        time.sleep(0.5)
+        if manager.get(running['id'])['progress'] <= 0:
+            failures.append("running job reported no progress")
+        manager.cancel(running['id'])
+        job = wait_for(manager, running['id'], {CANCELLED, DONE, FAILED})
+        if job['status'] != CANCELLED:
+            failures.append(f"cancelled running job ended as {job['status']}")
+
+        # Handler errors end the job as failed with the message
+        job = wait_for(manager, manager.submit('fail', {})['id'], {DONE, FAILED})
+        if job['status'] != FAILED or job['error'] != 'boom':
+            failures.append(f"failing job ended as {job['status']} ({job['error']})")
+
+        # A worker process that dies fails its job and is replaced
+        running = manager.submit('spin', {})
+        wait_for(manager, running['id'], {RUNNING})
+        for child in multiprocessing.active_children():
+            os.kill(child.pid, signal.SIGKILL)
+        job = wait_for(manager, running['id'], {CANCELLED, DONE, FAILED})
+        if job['status'] != FAILED:
+            failures.append(f"job of a killed worker ended as {job['status']}")
+        job = wait_for(manager, manager.submit('record', {'n': 5, 'log': log})['id'],
+                       {DONE, FAILED})
+        if job['status'] != DONE:
+            failures.append(f"job after a killed worker ended as {job['status']}")
+    except TimeoutError as e:
+        failures.append(str(e))
+    finally:
+        open(release, 'w').close()
+        manager.stop(timeout=5)
+    return failures
+
+
+def check_shared_sqlite(path, tmp_dir, managers=3, jobs=60):
+    """Every job on a shared SQLite store runs exactly once"""
+    failures = []
+    log = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.log")
+    pool = [JobManager(HANDLERS, SQLiteJobStore(path), num_workers=2, max_queued=jobs)
+            for _ in range(managers)]
+    try:
+        submitted = [pool[n % managers].submit('record', {'n': n, 'log': log})
+                     for n in range(jobs)]
+        for job in submitted:
+            finished = wait_for(pool[0], job['id'], {DONE, FAILED})
+            if finished['status'] != DONE:
+                failures.append(f"job {finished['params']['n']} ended as {finished['status']}")
+    except TimeoutError as e:
+        failures.append(str(e))
+    finally:
+        for manager in pool:
+            manager.stop(timeout=5)
+    runs = read_log(log)
+    if sorted(runs) != list(range(jobs)):
+        failures.append(f"{len(runs)} runs for {jobs} jobs "
+                        f"({len(runs) - len(set(runs))} duplicates)")
+    return failures
+
+
+def check_expired_leases(path):
+    """A job whose worker stops renewing its lease is requeued once, then failed"""
+    failures = []
+    store = SQLiteJobStore(path)
+    store.LEASE_SECONDS = 0.1
+    job = _new_job('record', {}, 0)
+    store.add(job, max_queued=1)
+    claims = []
+    for _ in range(store.MAX_ATTEMPTS):
+        # Claim and abandon it, as a recycled gunicorn worker would
+        claimed = store.claim(timeout=0)
+        claims.append(claimed and claimed['id'])
+        time.sleep(0.2)
+    if claims != [job['id']] * store.MAX_ATTEMPTS:
+        failures.append(f"abandoned job was claimed as {claims}")
+    if store.claim(timeout=0) is not None:
+        failures.append("job was requeued past MAX_ATTEMPTS")
+    if store.get(job['id'])['status'] != FAILED:
+        failures.append(f"abandoned job ended as {store.get(job['id'])['status']}")
+
+    # A renewed lease keeps the job running
+    job = _new_job('record', {}, 0)
+    store.add(job, max_queued=1)
+    store.claim(timeout=0)
+    for _ in range(3):
+        time.sleep(0.05)
+        store.heartbeat(job['id'])
+    if store.claim(timeout=0) is not None or store.get(job['id'])['status'] != RUNNING:
+        failures.append("job with a renewed lease was requeued")
+    return failures
+
+
+def main():
+    print("\n" + "=" * 70)
+    print("JOB QUEUE CHECKS")
+    print("=" * 70)
+
+    tmp_dir = tempfile.mkdtemp()
+    checks = [
+        ('memory store', lambda: check_store(MemoryJobStore, tmp_dir)),
+        ('sqlite store', lambda: check_store(
+            lambda: SQLiteJobStore(os.path.join(tmp_dir, 'a.db')), tmp_dir)),
+        ('shared sqlite', lambda: check_shared_sqlite(os.path.join(tmp_dir, 'b.db'), tmp_dir)),
+        ('expired leases', lambda: check_expired_leases(os.path.join(tmp_dir, 'c.db'))),
+    ]
+
+    failures = []
+    for name, check in checks:
+        found = check()
+        print(f"{name:<20} {'❌ ' + str(len(found)) + ' failures' if found else '✅ ok'}")
+        failures += [f"{name}: {failure}" for failure in found]
+
+    print("=" * 70)
+    if failures:
+        for failure in failures:
+            print("❌ " + failure)
+        sys.exit(1)
+    print("✅ job queue behaves on both stores")
+
+
+if __name__ == "__main__":
+    main()
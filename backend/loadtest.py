@@ -0,0 +1,402 @@
+"""
+Load generator for the /solve and /compare endpoints
+
+Usage:
+    python loadtest.py run [--workers 4] [--threads 1] [--requests 500] [--concurrency 16]
+                           [--sizes 21,51,101] [--heuristics "manhattan;manhattan,octile,custom"]
+                           [--compare-ratio 0.5] [--repeat-ratio 0.3] [--label baseline]
+    python loadtest.py compare old.json new.json
+
+'run' starts app.py under gunicorn on a free local port (or targets --url),
+replays a seeded mix of requests and reports throughput, p50/p95/p99
+latency, response bytes and the CPU time used by the gunicorn workers. The
+report is saved as JSON under data/loadtests/ next to this script, with the
+settings and git commit, so 'compare' can show what a code change did.
+
+Each request picks a maze size from --sizes and a heuristic set from
+--heuristics (sets separated by ';', names by ','). With probability
+--repeat-ratio it resends a maze already sent, which is what exercises the
+grid-keyed caches. CSV logging from /compare goes to a scratch file instead
+of data/experiments.csv.
+
+Needs gunicorn (in requirements.txt) unless --url is given. Worker CPU is
+read from /proc, so it is only reported on Linux.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from utils import generate_random_maze
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'loadtests')
+READY_TIMEOUT_S = 30
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(int(-(-p * len(sorted_values) // 100)), 1)
+    return sorted_values[rank - 1]
+
+
+def build_requests(args):
+    """
+    Pre-encode the request bodies so the client spends its time waiting,
+    not serialising
+
+    Returns:
+        list: (endpoint, body bytes, maze size label) tuples
+    """
+    rng = random.Random(args.seed)
+    random.seed(args.seed)  # generate_random_maze uses the module-level RNG
+    sizes = [int(s) for s in args.sizes.split(',')]
+    heuristic_sets = [names.split(',') for names in args.heuristics.split(';')]
+
+    sent = []
+    requests = []
+    for _ in range(args.requests + args.warmup):
+        if sent and rng.random() < args.repeat_ratio:
+            maze_body = rng.choice(sent)
+        else:
+            size = rng.choice(sizes)
+            maze = generate_random_maze(size, size, args.density)
+            maze_body = {'grid': maze.grid.tolist(), 'start': list(maze.start),
+                         'goal': list(maze.goal)}
+            sent.append(maze_body)
+
+        heuristics = rng.choice(heuristic_sets)
+        body = dict(maze_body, algorithm=args.algorithm)
+        if rng.random() < args.compare_ratio:
+            endpoint = '/compare'
+            body['heuristics'] = heuristics
+        else:
+            endpoint = '/solve'
+            body['heuristic'] = rng.choice(heuristics)
+        size_label = f"{len(maze_body['grid'])}x{len(maze_body['grid'][0])}"
+        requests.append((endpoint, json.dumps(body).encode(), size_label))
+    return requests
+
+
+# --- SERVER ---
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, csv_path):
+    """Start gunicorn serving app:app; returns (process, base url)"""
+    port = _free_port()
+    env = dict(os.environ, EXPERIMENTS_CSV=csv_path)
+    cmd = [sys.executable, '-m', 'gunicorn', 'app:app',
+           '--bind', f'127.0.0.1:{port}',
+           '--workers', str(args.workers), '--threads', str(args.threads),
+           '--log-level', 'warning']
+    process = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+
+    url = f'http://127.0.0.1:{port}'
+    # Wait for every worker where they can be counted, so none is still
+    # booting during the measurement; elsewhere the first answer will do
+    count_workers = os.access(_children_file(process.pid), os.R_OK)
+    deadline = time.time() + READY_TIMEOUT_S
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/')
+            if conn.getresponse().status == 200 and (
+                    not count_workers or len(worker_pids(process.pid)) >= args.workers):
+                conn.close()
+                return process, url
+            conn.close()
+        except OSError:
+            pass
+        time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f"gunicorn did not answer within {READY_TIMEOUT_S}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _children_file(pid):
+    return f'/proc/{pid}/task/{pid}/children'
+
+
+def worker_pids(master_pid):
+    """Child processes of the gunicorn master (Linux /proc only)"""
+    try:
+        with open(_children_file(master_pid)) as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+
+def cpu_seconds(pids):
+    """
+    User + system CPU time per process from /proc/<pid>/stat
+
+    Returns:
+        dict: pid -> seconds (processes that are gone are left out)
+    """
+    ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+    usage = {}
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                # The command name may contain spaces; fields resume after ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        usage[pid] = (int(fields[11]) + int(fields[12])) / ticks
+    return usage
+
+
+# --- CLIENT ---
+
+def replay(url, requests, concurrency):
+    """
+    Send the requests from `concurrency` threads, each on its own keep-alive
+    connection
+
+    Returns:
+        tuple: (samples, wall seconds) where samples are
+               (endpoint, size, status, latency seconds, response bytes)
+    """
+    parts = urlsplit(url)
+    queue = iter(requests)
+    lock = threading.Lock()
+    samples = []
+
+    def client():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=300)
+        headers = {'Content-Type': 'application/json'}
+        while True:
+            with lock:
+                item = next(queue, None)
+            if item is None:
+                break
+            endpoint, body, size = item
+            started = time.perf_counter()
+            try:
+                conn.request('POST', endpoint, body, headers)
+                response = conn.getresponse()
+                payload = response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=300)
+                payload, status = b'', 0
+            latency = time.perf_counter() - started
+            with lock:
+                samples.append((endpoint, size, status, latency, len(payload)))
+        conn.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarise(samples, wall):
+    """Throughput, latency percentiles (ms) and response bytes for a set of samples"""
+    latencies = sorted(s[3] for s in samples)
+    sizes = [s[4] for s in samples]
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for s in samples if s[2] != 200),
+        'throughput_rps': len(samples) / wall if wall else None,
+        'latency_ms': {f'p{p}': percentile(latencies, p) * 1000 for p in PERCENTILES}
+                      if latencies else {},
+        'response_bytes': {
+            'mean': sum(sizes) / len(sizes) if sizes else 0,
+            'max': max(sizes, default=0),
+            'total': sum(sizes),
+        },
+    }
+    if latencies:
+        summary['latency_ms']['mean'] = sum(latencies) / len(latencies) * 1000
+        summary['latency_ms']['max'] = latencies[-1] * 1000
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    requests = build_requests(args)
+    warmup, measured = requests[:args.warmup], requests[args.warmup:]
+
+    process = None
+    scratch = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+    scratch.close()
+    try:
+        if args.url:
+            url = args.url
+        else:
+            process, url = start_server(args, scratch.name)
+        replay(url, warmup, args.concurrency)
+
+        pids = worker_pids(process.pid) if process else []
+        cpu_before = cpu_seconds(pids)
+        samples, wall = replay(url, measured, args.concurrency)
+        cpu_after = cpu_seconds(pids)
+    finally:
+        if process:
+            stop_server(process)
+        os.unlink(scratch.name)
+
+    report = {
+        'label': args.label,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'commit': git_commit(),
+        'config': {key: value for key, value in vars(args).items() if key != 'command'},
+        'wall_s': wall,
+        'overall': summarise(samples, wall),
+        'by_endpoint': {},
+        'by_size': {},
+    }
+    for endpoint in sorted({s[0] for s in samples}):
+        report['by_endpoint'][endpoint] = summarise([s for s in samples if s[0] == endpoint], wall)
+    for size in sorted({s[1] for s in samples}, key=lambda label: int(label.split('x')[0])):
+        report['by_size'][size] = summarise([s for s in samples if s[1] == size], wall)
+
+    if cpu_before:
+        per_worker = [cpu_after[pid] - cpu_before[pid] for pid in cpu_before if pid in cpu_after]
+        report['worker_cpu'] = {
+            'total_s': sum(per_worker),
+            'per_worker_s': per_worker,
+            'utilisation': sum(per_worker) / wall if wall else None,  # 1.0 = one core busy
+            'ms_per_request': sum(per_worker) / len(samples) * 1000 if samples else None,
+        }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    name = datetime.now().strftime('%Y%m%d-%H%M%S') + (f'-{args.label}' if args.label else '')
+    path = os.path.join(RESULTS_DIR, f'{name}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\n✅ Saved to {path}")
+
+
+# --- REPORTING ---
+
+def _fmt(value, digits=1):
+    return '-' if value is None else f"{value:,.{digits}f}"
+
+
+def print_report(report):
+    config = report['config']
+    print(f"\n{report['label'] or 'run'} @ {report['commit'] or '?'}: "
+          f"{config['workers']} workers x {config['threads']} threads, "
+          f"concurrency {config['concurrency']}, {report['wall_s']:.1f}s")
+    print(f"{'':<12} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'avg bytes':>11}")
+    rows = [('overall', report['overall'])]
+    rows += list(report['by_endpoint'].items()) + list(report['by_size'].items())
+    for name, s in rows:
+        latency = s['latency_ms']
+        print(f"{name:<12} {s['requests']:>6} {s['errors']:>4} {_fmt(s['throughput_rps']):>8} "
+              f"{_fmt(latency.get('p50')):>9} {_fmt(latency.get('p95')):>9} "
+              f"{_fmt(latency.get('p99')):>9} {_fmt(s['response_bytes']['mean'], 0):>11}")
+    cpu = report.get('worker_cpu')
+    if cpu:
+        print(f"worker CPU: {cpu['total_s']:.2f}s total, {cpu['utilisation']:.2f} cores busy, "
+              f"{cpu['ms_per_request']:.2f} ms/request")
+
+
+def compare(old_path, new_path):
+    """Print the key metrics of two saved runs side by side"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    metrics = [
+        ('req/s', lambda r: r['overall']['throughput_rps']),
+        ('p50 ms', lambda r: r['overall']['latency_ms'].get('p50')),
+        ('p95 ms', lambda r: r['overall']['latency_ms'].get('p95')),
+        ('p99 ms', lambda r: r['overall']['latency_ms'].get('p99')),
+        ('avg bytes', lambda r: r['overall']['response_bytes']['mean']),
+        ('errors', lambda r: r['overall']['errors']),
+        ('CPU ms/req', lambda r: r.get('worker_cpu', {}).get('ms_per_request')),
+    ]
+    for endpoint in sorted(set(old['by_endpoint']) & set(new['by_endpoint'])):
+        metrics.append((f'{endpoint} p99',
+                        lambda r, e=endpoint: r['by_endpoint'][e]['latency_ms'].get('p99')))
+
+    changed = sorted(k for k in set(old['config']) | set(new['config'])
+                     if k != 'label' and old['config'].get(k) != new['config'].get(k))
+    if changed:
+        print(f"⚠️  Settings differ: {', '.join(changed)}")
+    print(f"{'':<16} {old['label'] or old['commit'] or 'old':>12} "
+          f"{new['label'] or new['commit'] or 'new':>12} {'change':>9}")
+    for name, get in metrics:
+        a, b = get(old), get(new)
+        change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else '-'
+        print(f"{name:<16} {_fmt(a):>12} {_fmt(b):>12} {change:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test /solve and /compare under gunicorn")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="start the app, replay a request mix, save a report")
+    run_parser.add_argument('--url', help="target a running server instead of starting gunicorn")
+    run_parser.add_argument('--workers', type=int, default=4, help="gunicorn worker processes")
+    run_parser.add_argument('--threads', type=int, default=1, help="threads per worker")
+    run_parser.add_argument('--concurrency', type=int, default=16, help="client connections")
+    run_parser.add_argument('--requests', type=int, default=500, help="measured requests")
+    run_parser.add_argument('--warmup', type=int, default=20, help="unmeasured requests sent first")
+    run_parser.add_argument('--sizes', default='21,51,101', help="comma-separated maze sizes")
+    run_parser.add_argument('--density', type=float, default=0.25, help="wall probability")
+    run_parser.add_argument('--heuristics', default='manhattan;manhattan,euclidean,octile,custom',
+                            help="heuristic sets, ';' between sets and ',' within one")
+    run_parser.add_argument('--algorithm', default='astar', help="astar, wavefront or corridor")
+    run_parser.add_argument('--compare-ratio', type=float, default=0.5,
+                            help="fraction of requests sent to /compare (the rest to /solve)")
+    run_parser.add_argument('--repeat-ratio', type=float, default=0.3,
+                            help="fraction of requests that resend an earlier maze")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--label', default='', help="name stored with the saved report")
+
+    compare_parser = sub.add_parser('compare', help="compare two saved reports")
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        compare(args.old, args.new)
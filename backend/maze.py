@@ -3,19 +3,147 @@
 Maze representation and utility functions
 """
 
+import hashlib
+
+import numpy as np
+
+
+class Grid:
+    """
+    Compact grid of cells (0=walkable, 1=wall) stored row-major in one
+    bytearray. Every search engine accepts it directly: list-style access
+    (len(grid), grid[r][c]) works, and np.asarray(grid) is a zero-copy uint8
+    view. The content hash and neighbour counts are computed on first use
+    and cached, so convert JSON/list input once with Grid.from_any and
+    reuse the object.
+    """
+
+    __slots__ = ('rows', 'cols', 'cells', '_array', '_key', '_degrees')
+
+    def __init__(self, cells, rows, cols):
+        """
+        Args:
+            cells: bytearray of rows * cols bytes, 1 = wall
+            rows, cols: grid shape
+        """
+        if len(cells) != rows * cols:
+            raise ValueError(f"Expected {rows * cols} cells, got {len(cells)}")
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self._array = None
+        self._key = None
+        self._degrees = None
+
+    @classmethod
+    def from_any(cls, grid):
+        """
+        Convert a grid from any supported form, without copying if it is
+        already a Grid
+
+        Args:
+            grid: Grid, Maze, numpy array or 2D list (non-zero = wall)
+
+        Returns:
+            Grid
+        """
+        if isinstance(grid, Grid):
+            return grid
+        if isinstance(grid, Maze):
+            return grid.grid
+        cells = np.asarray(grid)
+        if cells.ndim != 2:
+            raise ValueError("Grid must be a rectangular 2D array")
+        rows, cols = cells.shape
+        return cls(bytearray((cells != 0).astype(np.uint8).tobytes()), rows, cols)
+
+    def __reduce__(self):
+        return (Grid, (bytearray(self.cells), self.rows, self.cols))
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        """One row as a read-only view, so grid[r][c] works like a list"""
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        start = row * self.cols
+        return memoryview(self.cells)[start:start + self.cols].toreadonly()
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield self[row]
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.array
+        if dtype is not None and np.dtype(dtype) != array.dtype:
+            return array.astype(dtype)
+        return array.copy() if copy else array
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    @property
+    def array(self):
+        """Read-only (rows, cols) uint8 numpy view of the cells"""
+        if self._array is None:
+            array = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.rows, self.cols)
+            array.flags.writeable = False
+            self._array = array
+        return self._array
+
+    def is_open(self, row, col):
+        """True if (row, col) is inside the grid and walkable"""
+        return 0 <= row < self.rows and 0 <= col < self.cols and not self.cells[row * self.cols + col]
+
+    def tolist(self):
+        """Nested lists, for JSON responses"""
+        return self.array.tolist()
+
+    @property
+    def key(self):
+        """Content hash used as a cache key by the precomputation caches"""
+        if self._key is None:
+            digest = hashlib.sha1(self.cells).hexdigest()[:16]
+            self._key = f"{self.rows}x{self.cols}-{digest}"
+        return self._key
+
+    @property
+    def wall_density(self):
+        cells = self.rows * self.cols
+        return self.cells.count(1) / cells if cells else 0.0
+
+    def degrees(self):
+        """
+        Number of walkable 4-direction neighbours of each cell (0 for walls)
+
+        Returns:
+            numpy array: (rows, cols) uint8
+        """
+        if self._degrees is None:
+            open_cells = (self.array == 0).astype(np.uint8)
+            counts = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                counts[1 + dr:self.rows + 1 + dr, 1 + dc:self.cols + 1 + dc] += open_cells
+            self._degrees = counts[1:-1, 1:-1] * open_cells
+            self._degrees.flags.writeable = False
+        return self._degrees
+
+
 class Maze:
     def __init__(self, grid, start, goal):
         """
         Initialize a maze
         
         Args:
-            grid: 2D list where 0=walkable, 1=wall
+            grid: Grid, or 2D list where 0=walkable, 1=wall (converted once)
             start: tuple (row, col) for start position
             goal: tuple (row, col) for goal position
         """
-        self.grid = grid
-        self.height = len(grid)
-        self.width = len(grid[0]) if self.height > 0 else 0
+        self.grid = Grid.from_any(grid)
+        self.height = self.grid.rows
+        self.width = self.grid.cols
         self.start = start
         self.goal = goal
     
@@ -30,17 +158,7 @@ class Maze:
             bool: True if position is valid and walkable
         """
         row, col = position
-        
-        if row < 0 or row >= self.height:
-            return False
-        if col < 0 or col >= self.width:
-            return False
-        
-        # Check if not a wall
-        if self.grid[row][col] == 1:
-            return False
-        
-        return True
+        return self.grid.is_open(row, col)
     
     def get_neighbors(self, position, allow_diagonal=False):
         """
@@ -87,6 +205,16 @@ class Maze:
         """Check if position is the goal"""
         return position == self.goal
     
+    def to_dict(self):
+        """JSON-ready form used by the API"""
+        return {
+            'grid': self.grid.tolist(),
+            'start': list(self.start),
+            'goal': list(self.goal),
+            'height': self.height,
+            'width': self.width
+        }
+    
     @staticmethod
     def create_empty_maze(width, height):
         """
@@ -97,9 +225,9 @@ class Maze:
             height: int
         
         Returns:
-            2D list of zeros
+            Grid of zeros
         """
-        return [[0 for _ in range(width)] for _ in range(height)]
+        return Grid(bytearray(width * height), height, width)
     
     @staticmethod
     def create_simple_maze():
@@ -0,0 +1,328 @@
+"""
+Heuristic portfolio "race": run several heuristics, stop at the first
+finisher whose path is certified optimal
+
+Two ways to run the race:
+
+    interleave - one process; each search is a resumable generator
+                 (algorithms.a_star_steps) and gets slice_nodes expansions in
+                 turn
+    parallel   - one process per heuristic; the losers are terminated as soon
+                 as a winner is certified
+
+A path is certified optimal when it was found with an admissible, consistent
+heuristic for the movement mode, or when its cost is no greater than the
+lower bound (last expanded f-score) of a still-running admissible search.
+A failed search means the goal is unreachable, which is also final.
+
+With learn=True the order comes from past runs in data/experiments.csv on
+mazes of a similar size and wall density. The best admissible heuristic
+goes first and, in interleave mode, runs alone for a head start before the
+rest join.
+"""
+
+import csv
+import multiprocessing
+import os
+import queue
+import time
+
+from algorithms import a_star_steps
+from heuristics import get_heuristic
+from maze import Grid
+
+
+DIAGONAL_COST = 1.414  # matches algorithms.a_star_search
+
+# Consistent heuristics per movement mode. Octile and Euclidean both count a
+# diagonal step as sqrt(2) > 1.414, so they slightly overestimate when
+# diagonal moves are allowed.
+ADMISSIBLE = {
+    False: {'manhattan', 'euclidean', 'chebyshev', 'octile'},
+    True: {'chebyshev'},
+}
+
+DEFAULT_SLICE_NODES = 256
+
+# Runs count as "similar" within this wall-density difference and cell-count ratio
+DENSITY_TOLERANCE = 0.1
+SIZE_RATIO = 2.0
+
+# The first runner's head start is this many times its average nodes explored
+HEAD_START_FACTOR = 1.5
+
+_history_cache = {}
+
+
+def path_cost(path):
+    """Total move cost of a path of [row, col] cells"""
+    cost = 0
+    for (r1, c1), (r2, c2) in zip(path, path[1:]):
+        cost += DIAGONAL_COST if r1 != r2 and c1 != c2 else 1
+    return cost
+
+
+def wall_density(grid):
+    return Grid.from_any(grid).wall_density
+
+
+def _load_history(csv_path):
+    """Parsed rows of the experiments CSV, cached until the file changes"""
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return []
+    key = (csv_path, stat.st_mtime, stat.st_size)
+    if key not in _history_cache:
+        rows = []
+        with open(csv_path, newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    height, width = (int(v) for v in row['Maze Size'].split('x'))
+                    density = row.get('Wall Density')
+                    rows.append({
+                        'cells': height * width,
+                        'density': float(density) if density else None,
+                        'heuristic': row['Heuristic'],
+                        'nodes': int(row['Nodes Explored']),
+                    })
+                except (KeyError, ValueError, AttributeError):
+                    continue
+        _history_cache.clear()
+        _history_cache[key] = rows
+    return _history_cache[key]
+
+
+def learned_order(names, rows, cols, density, csv_path):
+    """
+    Order heuristics by average nodes explored on similar past runs
+
+    Args:
+        names: heuristic names to order
+        rows, cols: maze dimensions
+        density: wall fraction of the maze
+        csv_path: experiments CSV written by app.log_to_csv
+
+    Returns:
+        tuple: (ordered names, {name: average nodes explored}); heuristics
+               without history keep their given order after the rest
+    """
+    cells = rows * cols
+    totals = {}
+    for row in _load_history(csv_path):
+        if row['heuristic'] not in names:
+            continue
+        if not (cells / SIZE_RATIO <= row['cells'] <= cells * SIZE_RATIO):
+            continue
+        if row['density'] is not None and abs(row['density'] - density) > DENSITY_TOLERANCE:
+            continue
+        total, count = totals.get(row['heuristic'], (0, 0))
+        totals[row['heuristic']] = (total + row['nodes'], count + 1)
+
+    averages = {name: total / count for name, (total, count) in totals.items()}
+    ordered = sorted(names, key=lambda name: (name not in averages,
+                                              averages.get(name, 0), names.index(name)))
+    return ordered, averages
+
+
+class _Race:
+    """Bookkeeping shared by both race modes"""
+
+    def __init__(self, names, allow_diagonal):
+        self.names = names
+        self.admissible = [name in ADMISSIBLE[allow_diagonal] for name in names]
+        self.nodes = [0] * len(names)
+        self.bounds = [0.0] * len(names)
+        self.status = ['running'] * len(names)
+        self.results = [None] * len(names)
+        self.candidate = None  # (cost, index) of the best uncertified path
+        self.winner = None
+        self.certified = False
+
+    def bound(self):
+        """Best lower bound on the optimal cost among running admissible searches"""
+        bounds = [b for i, b in enumerate(self.bounds)
+                  if self.admissible[i] and self.status[i] == 'running']
+        return max(bounds) if bounds else None
+
+    def finish(self, i, result):
+        """Record a finished search; returns True once the race is decided"""
+        self.results[i] = result
+        self.nodes[i] = result['nodes_explored']
+        if result.get('budget_exhausted'):
+            self.status[i] = 'budget_exhausted'
+            return False
+        self.status[i] = 'finished'
+        if not result['success'] or self.admissible[i]:
+            self.winner, self.certified = i, True
+            return True
+        cost = path_cost(result['path'])
+        if self.candidate is None or cost < self.candidate[0]:
+            self.candidate = (cost, i)
+        return self.check_candidate()
+
+    def check_candidate(self):
+        bound = self.bound()
+        if self.candidate and bound is not None and self.candidate[0] <= bound + 1e-9:
+            self.winner, self.certified = self.candidate[1], True
+            return True
+        return False
+
+    def report(self, mode, order, elapsed):
+        if self.winner is None and self.candidate:
+            self.winner = self.candidate[1]  # best path found, but not proven optimal
+        runners = []
+        for i, name in enumerate(self.names):
+            status = 'winner' if i == self.winner else self.status[i]
+            if status == 'running':
+                status = 'cancelled'
+            runners.append({
+                'heuristic': name,
+                'status': status,
+                'admissible': self.admissible[i],
+                'nodes_explored': self.nodes[i],
+                'lower_bound': self.bounds[i],
+            })
+        result = None
+        if self.winner is not None:
+            result = dict(self.results[self.winner], heuristic=self.names[self.winner])
+        return {
+            'mode': mode,
+            'order': order,
+            'winner': self.names[self.winner] if self.winner is not None else None,
+            'certified_optimal': self.certified,
+            'result': result,
+            'runners': runners,
+            'time_taken': elapsed,
+        }
+
+
+def _interleave(race, steps, slice_nodes, head_start):
+    if head_start:
+        # Let the predicted winner run alone for a while before the others start
+        for _ in range(max(head_start // slice_nodes, 1)):
+            if not _advance(race, steps, 0):
+                break
+        if race.winner is not None:
+            return
+
+    while any(status == 'running' for status in race.status):
+        for i in range(len(steps)):
+            if race.status[i] == 'running':
+                _advance(race, steps, i)
+                if race.winner is not None:
+                    return
+        if race.check_candidate():
+            return
+
+
+def _advance(race, steps, i):
+    """Run one slice of search i; returns False once it has finished"""
+    try:
+        progress = next(steps[i])
+    except StopIteration as stop:
+        race.finish(i, stop.value)
+        return False
+    race.nodes[i] = progress['nodes_explored']
+    race.bounds[i] = progress['lower_bound']
+    return True
+
+
+def _race_worker(i, grid, start, goal, name, allow_diagonal, max_nodes, deadline,
+                 slice_nodes, nodes, bounds, results):
+    steps = a_star_steps(grid, start, goal, get_heuristic(name), allow_diagonal,
+                         max_nodes, slice_nodes=slice_nodes, deadline=deadline)
+    while True:
+        try:
+            progress = next(steps)
+        except StopIteration as stop:
+            results.put((i, stop.value))
+            return
+        nodes[i] = progress['nodes_explored']
+        bounds[i] = progress['lower_bound']
+
+
+def _parallel(race, grid, start, goal, allow_diagonal, max_nodes, deadline, slice_nodes):
+    n = len(race.names)
+    nodes = multiprocessing.Array('q', n, lock=False)
+    bounds = multiprocessing.Array('d', n, lock=False)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_race_worker, daemon=True,
+            args=(i, grid, start, goal, name, allow_diagonal, max_nodes, deadline,
+                  slice_nodes, nodes, bounds, results))
+        for i, name in enumerate(race.names)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        pending = n
+        while pending and race.winner is None:
+            try:
+                i, result = results.get(timeout=0.05)
+            except queue.Empty:
+                race.bounds[:] = bounds[:]
+                race.check_candidate()
+                continue
+            pending -= 1
+            race.bounds[:] = bounds[:]
+            race.finish(i, result)
+    finally:
+        for i, process in enumerate(processes):
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            if race.status[i] == 'running':
+                race.nodes[i] = nodes[i]
+                race.bounds[i] = bounds[i]
+
+
+def race_heuristics(grid, start, goal, names, allow_diagonal=False, mode='interleave',
+                    slice_nodes=DEFAULT_SLICE_NODES, max_nodes=None, deadline_ms=None,
+                    learn=False, csv_path=None):
+    """
+    Race A* with several heuristics and return the first certified result
+
+    Args:
+        grid: Grid or 2D list where 0=walkable, 1=wall
+        names: heuristic names to race
+        mode: 'interleave' (time slices in this process) or 'parallel'
+              (one process per heuristic)
+        slice_nodes: expansions per time slice / progress report
+        max_nodes: per-search node budget
+        deadline_ms: overall deadline shared by the whole race
+        learn: order the runners from past results in csv_path
+
+    Returns:
+        dict: 'winner', 'certified_optimal', the winner's full 'result', and
+              one 'runners' entry per heuristic with how far it got
+    """
+    if mode not in ('interleave', 'parallel'):
+        raise ValueError(f"Unknown race mode '{mode}'")
+    start_time = time.time()
+    # One absolute deadline for every runner, however late it starts
+    deadline = start_time + deadline_ms / 1000.0 if deadline_ms is not None else None
+    grid = Grid.from_any(grid)
+
+    order, head_start = list(names), 0
+    if learn and csv_path:
+        order, averages = learned_order(list(names), len(grid), len(grid[0]),
+                                        wall_density(grid), csv_path)
+        # Only an admissible runner can win on its own, so one of those goes first
+        order.sort(key=lambda name: name not in ADMISSIBLE[allow_diagonal])
+        head_start = int(averages.get(order[0], 0) * HEAD_START_FACTOR)
+
+    race = _Race(order, allow_diagonal)
+    if mode == 'parallel':
+        _parallel(race, grid, start, goal, allow_diagonal, max_nodes, deadline, slice_nodes)
+    else:
+        steps = [a_star_steps(grid, start, goal, get_heuristic(name), allow_diagonal,
+                              max_nodes, slice_nodes=slice_nodes, deadline=deadline)
+                 for name in order]
+        _interleave(race, steps, slice_nodes, head_start)
+        for generator in steps:
+            generator.close()
+
+    return race.report(mode, order, time.time() - start_time)
@@ -0,0 +1,156 @@
+# race_test.py
+"""
+Check the heuristic race against plain A* - certified winners must be optimal
+
+For random and carved mazes, with and without diagonal moves, every race
+result marked certified_optimal must have the same path cost as A* with a
+consistent heuristic (Manhattan, or Chebyshev with diagonals). Also checks
+that every heuristic race.ADMISSIBLE lists really is consistent, and that a
+race with a learned head start keeps to one overall deadline.
+Exits with status 1 on any failure.
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+from algorithms import a_star_search
+from heuristics import HEURISTICS, chebyshev_distance, manhattan_distance
+from race import ADMISSIBLE, DIAGONAL_COST, path_cost, race_heuristics
+from utils import generate_carved_maze, generate_random_maze
+
+NAMES = list(HEURISTICS)
+
+
+def reference_cost(maze, allow_diagonal):
+    """Optimal path cost from A* with a consistent heuristic, None if unreachable"""
+    heuristic = chebyshev_distance if allow_diagonal else manhattan_distance
+    result = a_star_search(maze.grid, maze.start, maze.goal, heuristic, allow_diagonal)
+    return path_cost(result['path']) if result['success'] else None
+
+
+def check_race(maze, allow_diagonal, mode):
+    """
+    Returns:
+        tuple: (certified, failure message or None)
+    """
+    race = race_heuristics(maze.grid, maze.start, maze.goal, NAMES,
+                           allow_diagonal=allow_diagonal, mode=mode)
+    if not race['certified_optimal']:
+        return False, None
+    expected = reference_cost(maze, allow_diagonal)
+    result = race['result']
+    where = f"{maze.height}x{maze.width} diagonal={allow_diagonal} {mode} ({race['winner']})"
+    if result['success'] != (expected is not None):
+        return True, f"{where}: success {result['success']}, A* {expected is not None}"
+    if result['success'] and abs(path_cost(result['path']) - expected) > 1e-9:
+        return True, f"{where}: cost {path_cost(result['path']):.3f}, A* {expected:.3f}"
+    return True, None
+
+
+def check_admissible_table():
+    """
+    Every heuristic listed in race.ADMISSIBLE must be consistent for its
+    movement mode: h(a) <= cost(a, b) + h(b) for every move from a to b
+
+    Returns:
+        list: failure messages
+    """
+    goal = (0, 0)
+    cells = [(r, c) for r in range(-6, 7) for c in range(-6, 7)]
+    failures = []
+    for allow_diagonal, names in ADMISSIBLE.items():
+        moves = [(dr, dc, DIAGONAL_COST if dr and dc else 1)
+                 for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                 if (dr or dc) and (allow_diagonal or not (dr and dc))]
+        for name in sorted(names):
+            h = HEURISTICS[name]
+            violation = next(((a, (a[0] + dr, a[1] + dc)) for a in cells for dr, dc, cost in moves
+                              if h(a, goal) > cost + h((a[0] + dr, a[1] + dc), goal) + 1e-9), None)
+            if violation:
+                failures.append(f"{name} is not consistent with diagonal={allow_diagonal}: "
+                                f"{violation[0]} -> {violation[1]}")
+    return failures
+
+
+def check_shared_deadline():
+    """A learned head start must not give the other runners a fresh deadline"""
+    n = 300
+    grid = [[0] * n for _ in range(n)]
+    for row in grid:
+        row[n - 2] = 1  # wall off the goal column
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Maze Size', 'Heuristic', 'Nodes Explored',
+                         'Path Length', 'Time (s)', 'Wall Density'])
+        writer.writerow(['', f'{n}x{n}', 'manhattan', 10 ** 6, 0, 1.0, f'{1 / n:.3f}'])
+    try:
+        deadline_ms = 500
+        started = time.time()
+        race_heuristics(grid, (0, 0), (n - 1, n - 1), ['manhattan', 'octile', 'euclidean'],
+                        deadline_ms=deadline_ms, learn=True, csv_path=f.name)
+        elapsed = time.time() - started
+    finally:
+        os.unlink(f.name)
+    # One slice past the deadline at most, plus some scheduling slack
+    if elapsed > deadline_ms / 1000 + 0.25:
+        return f"race with deadline_ms={deadline_ms} took {elapsed:.2f}s"
+    return None
+
+
+def main():
+    random.seed(0)
+
+    print("\n" + "=" * 70)
+    print("HEURISTIC RACE vs A*")
+    print("=" * 70)
+    print(f"{'Maze type':<18} {'Moves':<10} {'Mode':<12} {'Races':<7} {'Certified':<11} {'Failures'}")
+    print("-" * 70)
+
+    suites = [
+        ('random obstacles', lambda: generate_random_maze(random.randint(5, 40),
+                                                          random.randint(5, 40), 0.3)),
+        ('carved + loops', lambda: generate_carved_maze(random.randint(5, 41),
+                                                        random.randint(0, 30))),
+    ]
+
+    failures = []
+    for name, make_maze in suites:
+        for allow_diagonal in (False, True):
+            for mode, count in (('interleave', 40), ('parallel', 5)):
+                certified = 0
+                suite_failures = []
+                for _ in range(count):
+                    was_certified, failure = check_race(make_maze(), allow_diagonal, mode)
+                    certified += was_certified
+                    if failure:
+                        suite_failures.append(failure)
+                moves = '8-way' if allow_diagonal else '4-way'
+                print(f"{name:<18} {moves:<10} {mode:<12} {count:<7} {certified:<11} "
+                      f"{len(suite_failures)}")
+                failures += suite_failures
+
+    table_failures = check_admissible_table()
+    print(f"{'admissible table':<18} {'both':<10} {'-':<12} {'-':<7} {'-':<11} "
+          f"{len(table_failures)}")
+    failures += table_failures
+
+    deadline_failure = check_shared_deadline()
+    print(f"{'shared deadline':<18} {'':<10} {'interleave':<12} {1:<7} {'-':<11} "
+          f"{1 if deadline_failure else 0}")
+    if deadline_failure:
+        failures.append(deadline_failure)
+
+    print("=" * 70)
+    if failures:
+        for failure in failures[:20]:
+            print("❌ " + failure)
+        sys.exit(1)
+    print("✅ every certified race winner has the optimal path cost")
+
+
+if __name__ == "__main__":
+    main()
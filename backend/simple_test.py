@@ -31,7 +31,7 @@ def compare_heuristics_on_maze(maze, maze_name):
     results = []
     
     for h_name, h_func in HEURISTICS.items():
-        result = a_star_search(maze, h_func)
+        result = a_star_search(maze.grid, maze.start, maze.goal, h_func)
         
         print(f"{h_name:<15} {result['nodes_explored']:<15} "
               f"{result['path_length']:<15} {result['time_taken']:.6f}")
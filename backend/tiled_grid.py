@@ -0,0 +1,214 @@
+"""
+Out-of-core tiled grid format for maps larger than RAM
+
+The grid is split into square tiles (tile_size x tile_size, a power of two
+and a multiple of 8). Each tile is stored bit-packed (1 = wall), row-major
+inside the tile, and tiles are laid out row-major after a fixed header:
+
+    offset 0   8 bytes   magic b'TGRID1\\0\\0'
+    offset 8   uint64    rows
+    offset 16  uint64    cols
+    offset 24  uint32    tile_size
+    offset 28  uint32    reserved (0)
+    offset 32  tiles, tile_size * tile_size / 8 bytes each
+
+Cells past the right/bottom edge of the map are padded as walls. The file is
+opened with mmap and tiles are unpacked on first use into an LRU cache with
+a configurable memory budget, so only the neighbourhood the search actually
+touches is ever held in memory.
+"""
+
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+from maze import Grid
+
+
+MAGIC = b'TGRID1\0\0'
+HEADER = struct.Struct('<8sQQII')
+DEFAULT_TILE_SIZE = 256
+
+
+def _check_tile_size(tile_size):
+    if tile_size < 8 or tile_size & (tile_size - 1):
+        raise ValueError(f"tile_size must be a power of two >= 8, got {tile_size}")
+
+
+def write_tiled_grid(path, rows, cols, bands, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Write a tiled grid file from horizontal bands of rows
+
+    Only one band of tile_size rows is held in memory at a time, so this can
+    convert maps that do not fit in RAM.
+
+    Args:
+        path: output file path
+        rows, cols: map dimensions
+        bands: iterable of 2D arrays (non-zero = wall), each tile_size rows
+               tall except possibly the last, together covering all rows
+        tile_size: tile edge length in cells
+    """
+    _check_tile_size(tile_size)
+    tiles_across = -(-cols // tile_size)
+    padded_cols = tiles_across * tile_size
+
+    written = 0
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, rows, cols, tile_size, 0))
+        for band in bands:
+            band = np.asarray(band)
+            if band.shape[1] != cols or band.shape[0] > tile_size:
+                raise ValueError(f"Band of shape {band.shape} does not fit {tile_size}x{cols} tiles")
+            block = np.ones((tile_size, padded_cols), dtype=np.uint8)
+            block[:band.shape[0], :cols] = band != 0
+            # (rows, tiles_across, tile_size) -> one contiguous run per tile
+            tiles = block.reshape(tile_size, tiles_across, tile_size).transpose(1, 0, 2)
+            f.write(np.packbits(tiles, axis=None).tobytes())
+            written += band.shape[0]
+    if written != rows:
+        raise ValueError(f"Bands covered {written} rows, expected {rows}")
+
+
+def save_tiled_grid(path, grid, tile_size=DEFAULT_TILE_SIZE):
+    """Write an in-memory grid (2D list or array, 1 = wall) as a tiled grid file"""
+    cells = np.asarray(grid, dtype=np.uint8)
+    rows, cols = cells.shape
+    bands = (cells[r:r + tile_size] for r in range(0, rows, tile_size))
+    write_tiled_grid(path, rows, cols, bands, tile_size)
+
+
+class TiledGrid:
+    """
+    Read-only, memory-mapped tiled grid with an LRU tile cache
+
+    Args:
+        path: tiled grid file written by write_tiled_grid
+        cache_bytes: memory budget for unpacked tiles (one byte per cell)
+    """
+
+    def __init__(self, path, cache_bytes=64 * 1024 * 1024):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = None
+        self._cache = OrderedDict()
+        self._last_tile = None
+        try:
+            if os.fstat(self._file.fileno()).st_size < HEADER.size:
+                raise ValueError(f"{path} is too short to be a tiled grid file")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, rows, cols, tile_size, _ = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a tiled grid file")
+            _check_tile_size(tile_size)
+            tiles_across = -(-cols // tile_size)
+            tiles_down = -(-rows // tile_size)
+            packed_size = tile_size * tile_size // 8
+            expected = HEADER.size + tiles_across * tiles_down * packed_size
+            if len(self._mm) < expected:
+                raise ValueError(f"{path} is truncated: {len(self._mm)} bytes, "
+                                 f"a {rows}x{cols} grid needs {expected}")
+        except ValueError:
+            self.close()
+            raise
+
+        self.rows = rows
+        self.cols = cols
+        self.tile_size = tile_size
+        self._shift = tile_size.bit_length() - 1
+        self._mask = tile_size - 1
+        self._tiles_across = tiles_across
+        self._packed_size = packed_size
+
+        self.max_tiles = max(1, cache_bytes // (tile_size * tile_size))
+        self._last_key = None
+        self.tiles_loaded = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._cache.clear()
+        self._last_tile = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    def _tile(self, key):
+        """Unpacked tile as bytes (1 = wall), loading it on a cache miss"""
+        if key == self._last_key:
+            return self._last_tile
+        tile = self._cache.get(key)
+        if tile is None:
+            index = key[0] * self._tiles_across + key[1]
+            offset = HEADER.size + index * self._packed_size
+            packed = np.frombuffer(self._mm[offset:offset + self._packed_size], dtype=np.uint8)
+            tile = np.unpackbits(packed).tobytes()
+            self._cache[key] = tile
+            self.tiles_loaded += 1
+            if len(self._cache) > self.max_tiles:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        self._last_key = key
+        self._last_tile = tile
+        return tile
+
+    def is_open(self, row, col):
+        """True if (row, col) is inside the map and walkable"""
+        if row < 0 or col < 0 or row >= self.rows or col >= self.cols:
+            return False
+        tile = self._tile((row >> self._shift, col >> self._shift))
+        return not tile[((row & self._mask) << self._shift) | (col & self._mask)]
+
+    def read_region(self, row0, col0, height, width):
+        """
+        Copy a rectangular region into memory
+
+        Returns:
+            numpy array: uint8, 1 = wall, clipped to the map
+        """
+        row1, col1 = min(row0 + height, self.rows), min(col0 + width, self.cols)
+        row0, col0 = max(row0, 0), max(col0, 0)
+        out = np.ones((max(row1 - row0, 0), max(col1 - col0, 0)), dtype=np.uint8)
+        size = self.tile_size
+        for tr in range(row0 >> self._shift, ((row1 - 1) >> self._shift) + 1):
+            for tc in range(col0 >> self._shift, ((col1 - 1) >> self._shift) + 1):
+                tile = np.frombuffer(self._tile((tr, tc)), dtype=np.uint8).reshape(size, size)
+                r_lo, r_hi = max(row0, tr * size), min(row1, (tr + 1) * size)
+                c_lo, c_hi = max(col0, tc * size), min(col1, (tc + 1) * size)
+                out[r_lo - row0:r_hi - row0, c_lo - col0:c_hi - col0] = \
+                    tile[r_lo - tr * size:r_hi - tr * size, c_lo - tc * size:c_hi - tc * size]
+        return out
+
+
+def grid_access(grid):
+    """
+    Uniform read access to a grid held in memory or on disk
+
+    Args:
+        grid: Grid, 2D list / numpy array (0 = walkable) or a TiledGrid
+
+    Returns:
+        tuple: (rows, cols, is_open) where is_open(row, col) is True for
+               walkable cells; callers still bounds-check in-memory grids
+    """
+    if isinstance(grid, TiledGrid):
+        return grid.rows, grid.cols, grid.is_open
+    if isinstance(grid, Grid):
+        cells, cols = grid.cells, grid.cols
+        return grid.rows, cols, lambda row, col: not cells[row * cols + col]
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    return rows, cols, lambda row, col: grid[row][col] == 0
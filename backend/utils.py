@@ -37,6 +37,41 @@ def generate_random_maze(width, height, obstacle_probability=0.3):
     return Maze(grid, start, goal)
 
 
+def generate_carved_maze(size, extra_openings=0):
+    """
+    Generate a perfect maze with a recursive backtracker, optionally
+    knocking out extra walls to add loops
+
+    Args:
+        size: maze width and height (rounded up to an odd number)
+        extra_openings: number of random wall cells to open afterwards
+
+    Returns:
+        Maze object with start (1, 1) and goal in the opposite corner
+    """
+    size = size if size % 2 else size + 1
+    grid = [[1] * size for _ in range(size)]
+    grid[1][1] = 0
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        options = [(dr, dc) for dr, dc in ((0, 2), (0, -2), (2, 0), (-2, 0))
+                   if 0 < row + dr < size - 1 and 0 < col + dc < size - 1
+                   and grid[row + dr][col + dc] == 1]
+        if not options:
+            stack.pop()
+            continue
+        dr, dc = random.choice(options)
+        grid[row + dr // 2][col + dc // 2] = 0
+        grid[row + dr][col + dc] = 0
+        stack.append((row + dr, col + dc))
+
+    for _ in range(extra_openings):
+        grid[random.randrange(1, size - 1)][random.randrange(1, size - 1)] = 0
+
+    return Maze(grid, start=(1, 1), goal=(size - 2, size - 2))
+
+
 def create_medium_maze():
     """Create a 10x10 medium difficulty maze"""
     grid = [
@@ -77,7 +112,7 @@ if __name__ == "__main__":
     ]
     
     for name, hfunc in heuristics:
-        result = a_star_search(maze, hfunc)
+        result = a_star_search(maze.grid, maze.start, maze.goal, hfunc)
         print(f"{name:12} - Nodes: {result['nodes_explored']:3}, "
               f"Path: {result['path_length']:2}, "
               f"Time: {result['time_taken']:.6f}s")
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Vectorised breadth-first "wavefront" search for unit-cost grids
+
+Instead of popping one node at a time, the whole frontier is expanded per
+step: the next frontier is the frontier's shifted copies OR-ed together,
+masked by a boolean array of walkable, not-yet-visited cells. Each cell's
+layer number is recorded so the path can be walked back afterwards.
+
+Every move costs 1, including diagonals when allow_diagonal is set, so with
+diagonals the path has the fewest moves rather than the lowest 1/1.414 cost.
+"""
+
+import time
+
+import numpy as np
+
+from algorithms import budget_exhausted_result
+
+
+STRAIGHT_MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DIAGONAL_MOVES = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _dilate(frontier, moves):
+    """Cells one move away from any frontier cell (the frontier itself excluded)"""
+    grown = np.zeros_like(frontier)
+    rows, cols = frontier.shape
+    for dr, dc in moves:
+        # grown[r + dr, c + dc] |= frontier[r, c]
+        dst_r = slice(max(dr, 0), rows + min(dr, 0))
+        src_r = slice(max(-dr, 0), rows + min(-dr, 0))
+        dst_c = slice(max(dc, 0), cols + min(dc, 0))
+        src_c = slice(max(-dc, 0), cols + min(-dc, 0))
+        grown[dst_r, dst_c] |= frontier[src_r, src_c]
+    return grown
+
+
+# Dilate the frontier as a dense bool window when it fills at least
+# 1/DENSE_FRONTIER_RATIO of its bounding box; otherwise gather neighbours by
+# flat index, which costs O(frontier) instead of O(bounding box)
+DENSE_FRONTIER_RATIO = 8
+
+
+def wavefront_layers(grid, source, allow_diagonal=False, goal=None,
+                     max_nodes=None, deadline=None, on_layer=None, should_stop=None):
+    """
+    Run the wavefront from source and label every reached cell with its layer
+
+    The grid is padded with a ring of walls so neighbours never need bounds
+    checks. Each step expands the whole frontier at once, either by shifted
+    boolean dilation over the frontier's bounding box or, for thin frontiers
+    (e.g. maze corridors or the rim of an open diamond), by offsetting the
+    frontier's flat indices.
+
+    Args:
+        grid: 2D list or numpy array where 0=walkable, 1=wall
+        source: (row, col)
+        allow_diagonal: 8-direction moves, each costing one layer
+        goal: optional (row, col); stop once its layer is reached
+        max_nodes: stop once this many cells have been reached
+        deadline: time.time() value after which to stop
+        on_layer: optional callback(cells) with each layer's (k, 2) array of
+                  [row, col] in row-major order
+        should_stop: optional callable(cells reached) polled once per layer;
+                     returning True stops the wavefront
+
+    Returns:
+        tuple: (layers, stop_reason) where layers is an int32 array with -1
+               for unreached cells and stop_reason is None, 'max_nodes',
+               'deadline' or 'cancelled'
+    """
+    open_cells = np.asarray(grid, dtype=np.uint8) == 0
+    rows, cols = open_cells.shape
+    width = cols + 2
+    moves = STRAIGHT_MOVES + DIAGONAL_MOVES if allow_diagonal else STRAIGHT_MOVES
+    offsets = np.array([dr * width + dc for dr, dc in moves])
+
+    # Walkable and not yet reached, padded with walls
+    available = np.zeros((rows + 2, width), dtype=bool)
+    available[1:-1, 1:-1] = open_cells
+    layers = np.full((rows + 2, width), -1, dtype=np.int32)
+    available_flat = available.ravel()
+    layers_flat = layers.ravel()
+
+    def to_cells(indices):
+        return np.stack((indices // width - 1, indices % width - 1), axis=1)
+
+    frontier = np.array([(int(source[0]) + 1) * width + int(source[1]) + 1])
+    available_flat[frontier] = False
+    layers_flat[frontier] = 0
+    if on_layer:
+        on_layer(to_cells(frontier))
+    goal_flat = (goal[0] + 1) * width + goal[1] + 1 if goal is not None else None
+    reached = 1
+    depth = 0
+
+    while goal_flat is None or layers_flat[goal_flat] < 0:
+        if max_nodes is not None and reached >= max_nodes:
+            return np.ascontiguousarray(layers[1:-1, 1:-1]), 'max_nodes'
+        if deadline is not None and time.time() >= deadline:
+            return np.ascontiguousarray(layers[1:-1, 1:-1]), 'deadline'
+        if should_stop is not None and should_stop(reached):
+            return np.ascontiguousarray(layers[1:-1, 1:-1]), 'cancelled'
+
+        # frontier is sorted, so its first/last entries bound the rows
+        r0, r1 = frontier[0] // width - 1, frontier[-1] // width + 2
+        frontier_cols = frontier % width
+        c0, c1 = frontier_cols.min() - 1, frontier_cols.max() + 2
+
+        if len(frontier) * DENSE_FRONTIER_RATIO >= (r1 - r0) * (c1 - c0):
+            window = np.zeros((r1 - r0, c1 - c0), dtype=bool)
+            window.ravel()[(frontier // width - r0) * (c1 - c0) + frontier_cols - c0] = True
+            new = _dilate(window, moves)
+            new &= available[r0:r1, c0:c1]
+            wr, wc = np.nonzero(new)
+            nxt = (wr + r0) * width + wc + c0
+        else:
+            nxt = (frontier[:, None] + offsets).ravel()
+            nxt = np.unique(nxt[available_flat[nxt]])
+
+        if len(nxt) == 0:
+            break
+
+        depth += 1
+        available_flat[nxt] = False
+        layers_flat[nxt] = depth
+        reached += len(nxt)
+        if on_layer:
+            on_layer(to_cells(nxt))
+        frontier = nxt
+
+    return np.ascontiguousarray(layers[1:-1, 1:-1]), None
+
+
+def wavefront_distances(grid, source, allow_diagonal=False):
+    """
+    Unit-cost distance from source to every cell
+
+    Returns:
+        numpy array: int32, -1 for walls and unreachable cells
+    """
+    layers, _ = wavefront_layers(grid, source, allow_diagonal)
+    return layers
+
+
+def path_from_layers(layers, start, goal, allow_diagonal=False):
+    """
+    Walk back from goal to start through strictly decreasing layers
+
+    Returns:
+        list: path as [row, col] pairs from start to goal
+    """
+    moves = STRAIGHT_MOVES + DIAGONAL_MOVES if allow_diagonal else STRAIGHT_MOVES
+    rows, cols = layers.shape
+    r, c = int(goal[0]), int(goal[1])
+    path = [[r, c]]
+    depth = int(layers[r, c])
+    while depth > 0:
+        for dr, dc in moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and layers[nr, nc] == depth - 1:
+                r, c = nr, nc
+                break
+        depth -= 1
+        path.append([r, c])
+    path.reverse()
+    if path[0] != [int(start[0]), int(start[1])]:
+        return []
+    return path
+
+
+def wavefront_search(grid, start, goal, heuristic_func=None, allow_diagonal=False,
+                     max_nodes=None, deadline_ms=None, should_stop=None):
+    """
+    Drop-in alternative to a_star_search using the vectorised wavefront.
+    The heuristic is ignored; 'explored' lists cells layer by layer. Raises
+    ValueError if start or goal is outside the grid.
+
+    Returns:
+        dict: same shape as a_star_search's result
+    """
+    start_time = time.time()
+    deadline = start_time + deadline_ms / 1000.0 if deadline_ms is not None else None
+    goal_tuple = (int(goal[0]), int(goal[1]))
+    rows, cols = len(grid), len(grid[0]) if len(grid) else 0
+    for name, (r, c) in (('start', start), ('goal', goal_tuple)):
+        # Out-of-range cells would land in (or wrap around) the padding ring
+        if not (0 <= r < rows and 0 <= c < cols):
+            raise ValueError(f"{name} {[r, c]} is outside the {rows}x{cols} grid")
+
+    explored_order = []
+    layers, stop_reason = wavefront_layers(
+        grid, start, allow_diagonal, goal=goal_tuple, max_nodes=max_nodes,
+        deadline=deadline, on_layer=lambda cells: explored_order.extend(cells.tolist()),
+        should_stop=should_stop
+    )
+
+    if stop_reason:
+        # Partial path to the reached cell with the lowest Manhattan distance to the goal
+        reached = np.argwhere(layers >= 0)
+        h = np.abs(reached - goal_tuple).sum(axis=1)
+        best = reached[np.argmin(h)]
+        partial = path_from_layers(layers, start, best, allow_diagonal)
+        return budget_exhausted_result(stop_reason, partial, explored_order,
+                                       time.time() - start_time)
+
+    path = path_from_layers(layers, start, goal_tuple, allow_diagonal) \
+        if layers[goal_tuple] >= 0 else []
+    return {
+        'success': bool(path),
+        'budget_exhausted': False,
+        'path': path,
+        'explored': explored_order,
+        'nodes_explored': len(explored_order),
+        'path_length': len(path),
+        'time_taken': time.time() - start_time
+    }
@@ -116,8 +116,6 @@ function App() {
                   grid={mazeData.grid}
                   start={mazeData.start}
                   goal={mazeData.goal}
-                  path={[]}
-                  exploredCells={[]}
                   heuristicName="Preview"
                 />
               </div>
@@ -161,8 +159,8 @@ function App() {
               grid={mazeData.grid}
               start={mazeData.start}
               goal={mazeData.goal}
-              path={result.path || []}
-              exploredCells={result.explored || []} 
+              path={result.path}
+              exploredCells={result.explored}
               heuristicName={result.heuristic}
               stats={result}
               animationSpeed={animationSpeed}
@@ -1,152 +1,183 @@
-import React, { useEffect, useRef, useState, useMemo } from 'react';
-import * as d3 from 'd3';
+import React, { useEffect, useLayoutEffect, useRef, useState, useMemo } from 'react';
 import styles from './MazeGrid.module.css';
 
+// Cell states, one byte per cell in a Uint8Array (row-major)
+const FREE = 0;
+const WALL = 1;
+const EXPLORED = 2;
+const PATH = 3;
+
+const MAX_SIZE_PX = 380;
+const MAX_CELL_PX = 30;
+
+// Large searches would take minutes at the base rate, so each phase is sped
+// up to finish within this many seconds
+const MAX_EXPLORE_SECONDS = 10;
+const MAX_PATH_SECONDS = 4;
+
+const EMPTY = [];
+
+const rgba = (hex) => {
+  const n = parseInt(hex.slice(1), 16);
+  // ImageData is RGBA in memory, i.e. ABGR as a little-endian Uint32
+  return ((255 << 24) | ((n & 0xff) << 16) | (n & 0xff00) | (n >> 16)) >>> 0;
+};
+
+const PALETTE = new Uint32Array([
+  rgba('#4ade80'), // FREE (grass)
+  rgba('#166534'), // WALL
+  rgba('#82acc9'), // EXPLORED (#a78bfa at 60% over the grass)
+  rgba('#f43f5e'), // PATH
+]);
+
 const MazeGrid = ({
   grid,
   start,
   goal,
-  path = [],
-  exploredCells = [], 
+  path = EMPTY,
+  exploredCells = EMPTY,
   heuristicName = '',
   stats = null,
   animationSpeed = 0.25,
   isWinner = false,
   onAnimationComplete // <--- NEW PROP
 }) => {
-  const svgRef = useRef(null);
-  const [animatedExplored, setAnimatedExplored] = useState([]);
-  const [animatedPath, setAnimatedPath] = useState([]);
-  const [goalReached, setGoalReached] = useState(false);
-  const [isAnimating, setIsAnimating] = useState(false);
+  const canvasRef = useRef(null);
   const [progress, setProgress] = useState(0);
-
-  const instanceId = useMemo(() => Math.floor(Math.random() * 10000), []);
-  const grassId = `grass-${instanceId}`;
-  const wallId = `wall-${instanceId}`;
-  const pathId = `path-${instanceId}`;
+  const onCompleteRef = useRef(onAnimationComplete);
+  useLayoutEffect(() => {
+    onCompleteRef.current = onAnimationComplete;
+  }, [onAnimationComplete]);
 
   const rows = grid ? grid.length : 0;
   const cols = grid && grid[0] ? grid[0].length : 0;
-  const cellSize = Math.min(Math.floor(380 / (cols || 1)), Math.floor(380 / (rows || 1)), 30);
-
-  const inArray = (arr, r, c) => {
-    if (!arr || arr.length === 0) return false;
-    return arr.some(item => item[0] === r && item[1] === c);
-  };
-
-  const pathDeps = JSON.stringify(path);
-  const exploredDeps = JSON.stringify(exploredCells);
+  // Whole pixels per cell while they fit, fractional (one cell < 1px) beyond ~380 cells
+  const fitted = Math.min(MAX_SIZE_PX / (cols || 1), MAX_SIZE_PX / (rows || 1), MAX_CELL_PX);
+  const cellSize = fitted >= 1 ? Math.floor(fitted) : fitted;
+  const width = Math.max(Math.round(cols * cellSize), 1);
+  const height = Math.max(Math.round(rows * cellSize), 1);
+
+  // Wall layout, rebuilt only when the grid itself changes
+  const walls = useMemo(() => {
+    const cells = new Uint8Array(rows * cols);
+    for (let r = 0; r < rows; r++) {
+      const row = grid[r];
+      for (let c = 0; c < cols; c++) {
+        cells[r * cols + c] = row[c] === 1 ? WALL : FREE;
+      }
+    }
+    return cells;
+  }, [grid, rows, cols]);
 
   useEffect(() => {
-    const currentPath = JSON.parse(pathDeps);
-    const currentExplored = JSON.parse(exploredDeps);
-
-    if (!currentPath || currentPath.length === 0) {
-      setAnimatedExplored([]);
-      setAnimatedPath([]);
-      setIsAnimating(false);
+    const canvas = canvasRef.current;
+    if (!canvas || !rows || !cols) return;
+
+    // One pixel per cell off screen; the visible canvas scales it up
+    const cells = walls.slice();
+    const image = new ImageData(cols, rows);
+    const pixels = new Uint32Array(image.data.buffer);
+    for (let i = 0; i < cells.length; i++) pixels[i] = PALETTE[cells[i]];
+    const buffer = document.createElement('canvas');
+    buffer.width = cols;
+    buffer.height = rows;
+    const bufferCtx = buffer.getContext('2d');
+    const ctx = canvas.getContext('2d');
+
+    const paint = (r, c, state) => {
+      const i = r * cols + c;
+      if (cells[i] === WALL || cells[i] === state) return;
+      cells[i] = state;
+      pixels[i] = PALETTE[state];
+    };
+
+    const drawMarker = (cell, color, label) => {
+      const size = Math.max(cellSize, 4);
+      const x = cell[1] * cellSize + (cellSize - size) / 2;
+      const y = cell[0] * cellSize + (cellSize - size) / 2;
+      ctx.fillStyle = color;
+      if (cellSize >= 8) {
+        ctx.beginPath();
+        ctx.roundRect(x + 1, y + 1, size - 2, size - 2, 4);
+        ctx.fill();
+        ctx.fillStyle = 'white';
+        ctx.font = `bold ${Math.round(size * 0.55)}px sans-serif`;
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        ctx.fillText(label, x + size / 2, y + size / 2 + 1);
+      } else {
+        ctx.fillRect(x, y, size, size);
+      }
+    };
+
+    let reachedGoal = false;
+    const draw = () => {
+      bufferCtx.putImageData(image, 0, 0);
+      ctx.imageSmoothingEnabled = false;
+      ctx.clearRect(0, 0, width, height);
+      ctx.drawImage(buffer, 0, 0, width, height);
+      if (start) drawMarker(start, '#3b82f6', 'S');
+      if (goal) drawMarker(goal, reachedGoal ? '#00e676' : '#ef4444', 'E');
+    };
+
+    setProgress(0);
+    if (!path.length) {
+      draw();
       return;
     }
 
-    setIsAnimating(true);
-    setAnimatedExplored([]);
-    setAnimatedPath([]);
-    setGoalReached(false);
-
-    const totalSteps = currentExplored.length + currentPath.length;
-    const baseMs = 30; 
-    const delay = baseMs / animationSpeed;
-
-    let step = 0;
-    const exploreTimer = setInterval(() => {
-      if (step < currentExplored.length) {
-        const chunkSize = animationSpeed > 1 ? 15 : 3;
-        const chunk = currentExplored.slice(step, step + chunkSize);
-        setAnimatedExplored(prev => [...prev, ...chunk]);
-        step += chunkSize;
-        setProgress(step / totalSteps);
-      } else {
-        clearInterval(exploreTimer);
-        
-        let pathStep = 0;
-        const pathTimer = setInterval(() => {
-          if (pathStep < currentPath.length) {
-            const point = currentPath[pathStep];
-            setAnimatedPath(prev => [...prev, point]);
-            pathStep++;
-            setProgress((currentExplored.length + pathStep) / totalSteps);
-            
-            if (goal && point[0] === goal[0] && point[1] === goal[1]) {
-              setGoalReached(true);
-            }
-          } else {
-            clearInterval(pathTimer);
-            setIsAnimating(false);
-            setGoalReached(true);
-            // --- CRITICAL: Tell the parent we are done! ---
-            if (onAnimationComplete) onAnimationComplete(); 
-          }
-        }, delay);
+    // Base rates match the old timers: 3 (or 15 above 1x) explored cells per
+    // half tick and one path cell per tick of 30ms / speed
+    const tickMs = 30 / animationSpeed;
+    const exploreRate = Math.max(
+      (animationSpeed > 1 ? 15 : 3) / (tickMs / 2),
+      exploredCells.length / (MAX_EXPLORE_SECONDS * 1000)
+    );
+    const pathRate = Math.max(1 / tickMs, path.length / (MAX_PATH_SECONDS * 1000));
+    const total = exploredCells.length + path.length;
+
+    let exploredDone = 0;
+    let pathDone = 0;
+    let elapsed = 0;
+    let last = null;
+    let frame;
+
+    const step = (now) => {
+      elapsed += last === null ? 0 : now - last;
+      last = now;
+
+      // Apply everything that is due since the last frame as one batch
+      const exploreTarget = Math.min(Math.floor(elapsed * exploreRate), exploredCells.length);
+      for (; exploredDone < exploreTarget; exploredDone++) {
+        const [r, c] = exploredCells[exploredDone];
+        paint(r, c, EXPLORED);
       }
-    }, delay / 2);
-
-    return () => clearInterval(exploreTimer);
-  }, [pathDeps, exploredDeps, animationSpeed, goal]);
-
-  useEffect(() => {
-    if (!svgRef.current || !grid || !grid.length) return;
-    const svg = d3.select(svgRef.current);
-    svg.selectAll('*').remove();
-    const W = cols * cellSize;
-    const H = rows * cellSize;
-    svg.attr('width', W).attr('height', H);
-    const defs = svg.append('defs');
-
-    defs.append('linearGradient').attr('id', grassId).attr('x1','0').attr('y1','0').attr('x2','0').attr('y2','1')
-        .selectAll('stop').data([{o:'0%', c:'#86efac'}, {o:'100%', c:'#4ade80'}]).enter().append('stop')
-        .attr('offset', d => d.o).attr('stop-color', d => d.c);
-
-    defs.append('linearGradient').attr('id', wallId).attr('x1','0').attr('y1','0').attr('x2','0').attr('y2','1')
-        .selectAll('stop').data([{o:'0%', c:'#166534'}, {o:'100%', c:'#14532d'}]).enter().append('stop')
-        .attr('offset', d => d.o).attr('stop-color', d => d.c);
-
-    defs.append('linearGradient').attr('id', pathId).attr('x1','0').attr('y1','0').attr('x2','1').attr('y2','1')
-        .selectAll('stop').data([{o:'0%', c:'#f43f5e'}, {o:'100%', c:'#fb7185'}]).enter().append('stop')
-        .attr('offset', d => d.o).attr('stop-color', d => d.c);
-
-    svg.append('rect').attr('width', W).attr('height', H).attr('fill', 'none').attr('stroke', '#14532d').attr('stroke-width', 4).attr('rx', 4);
-    const cellGroup = svg.append('g');
-
-    for (let r = 0; r < rows; r++) {
-      for (let c = 0; c < cols; c++) {
-        const isWall = grid[r][c] === 1;
-        const isStart = start && r === start[0] && c === start[1];
-        const isGoal = goal && r === goal[0] && c === goal[1];
-        const isP = inArray(animatedPath, r, c);
-        const isE = !isP && inArray(animatedExplored, r, c);
-        const g = cellGroup.append('g').attr('transform', `translate(${c * cellSize},${r * cellSize})`);
-
-        if (isWall) {
-          g.append('rect').attr('width', cellSize).attr('height', cellSize).attr('fill', `url(#${wallId})`);
-        } else {
-          g.append('rect').attr('width', cellSize).attr('height', cellSize).attr('fill', `url(#${grassId})`);
-          if (isE && !isStart && !isGoal) g.append('rect').attr('width', cellSize).attr('height', cellSize).attr('fill', '#a78bfa').attr('opacity', 0.6).attr('rx', 2);
-          if (isP && !isStart && !isGoal) g.append('rect').attr('width', cellSize).attr('height', cellSize).attr('fill', `url(#${pathId})`).attr('rx', 3);
+      if (exploredDone === exploredCells.length) {
+        const pathElapsed = elapsed - exploredCells.length / exploreRate;
+        const pathTarget = Math.min(Math.floor(pathElapsed * pathRate) + 1, path.length);
+        for (; pathDone < pathTarget; pathDone++) {
+          const [r, c] = path[pathDone];
+          paint(r, c, PATH);
+          if (goal && r === goal[0] && c === goal[1]) reachedGoal = true;
         }
+      }
 
-        if (isStart) {
-          g.append('rect').attr('width', cellSize-2).attr('height', cellSize-2).attr('x', 1).attr('y', 1).attr('fill', '#3b82f6').attr('rx', 4);
-          g.append('text').attr('x', cellSize/2).attr('y', cellSize/2).attr('text-anchor', 'middle').attr('dy', '.35em').attr('fill', 'white').style('font-weight', 'bold').text('S');
-        }
-        if (isGoal) {
-          const gCol = goalReached ? '#00e676' : '#ef4444';
-          g.append('rect').attr('width', cellSize-2).attr('height', cellSize-2).attr('x', 1).attr('y', 1).attr('fill', gCol).attr('rx', 4);
-          g.append('text').attr('x', cellSize/2).attr('y', cellSize/2).attr('text-anchor', 'middle').attr('dy', '.35em').attr('fill', 'white').style('font-weight', 'bold').text('E');
-        }
+      draw();
+      setProgress((exploredDone + pathDone) / total);
+
+      if (pathDone < path.length) {
+        frame = requestAnimationFrame(step);
+      } else {
+        reachedGoal = true;
+        draw();
+        // --- CRITICAL: Tell the parent we are done! ---
+        if (onCompleteRef.current) onCompleteRef.current();
       }
-    }
-  }, [animatedExplored.length, animatedPath.length, goalReached, grid, start, goal]);
+    };
+    frame = requestAnimationFrame(step);
+
+    return () => cancelAnimationFrame(frame);
+  }, [walls, rows, cols, width, height, cellSize, path, exploredCells, animationSpeed, start, goal]);
 
   return (
     <div className={`${styles.card} ${isWinner ? styles.cardWinner : ''}`}>
@@ -155,7 +186,9 @@ const MazeGrid = ({
       <div className={styles.progressBar}>
         <div className={styles.progressFill} style={{ width: `${progress * 100}%` }}></div>
       </div>
-      <div className={styles.mazeFrame}><svg ref={svgRef} /></div>
+      <div className={styles.mazeFrame}>
+        <canvas ref={canvasRef} width={width} height={height} className={styles.canvas} />
+      </div>
       {stats && (
         <div className={styles.statsGrid}>
           <div className={styles.statBox}><span className={styles.statLabel}>Nodes Explored</span><span className={`${styles.statVal} ${styles.statBlue}`}>{stats.nodes_explored}</span></div>
@@ -167,4 +200,4 @@ const MazeGrid = ({
   );
 };
 
-export default MazeGrid;
\ No newline at end of file
+export default MazeGrid;
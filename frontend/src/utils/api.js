@@ -18,5 +18,22 @@ export const api = {
       grid, start, goal, heuristics, allow_diagonal: allowDiagonal
     });
     return response.data;
+  },
+  computeFlowField: async (grid, goal, starts = [], allowDiagonal = false) => {
+    const response = await axios.post(`${API_BASE_URL}/flow-field`, {
+      grid, goal, starts, allow_diagonal: allowDiagonal
+    });
+    return response.data;
+  },
+  // Returns { rows, cols, data } where data is an Int32Array (-1 = unreachable)
+  // or a Float32Array (Infinity = unreachable), row-major
+  downloadFlowField: async (fieldId) => {
+    const response = await axios.get(`${API_BASE_URL}/flow-field/${fieldId}`, {
+      responseType: 'arraybuffer'
+    });
+    const rows = Number(response.headers['x-field-rows']);
+    const cols = Number(response.headers['x-field-cols']);
+    const TypedArray = response.headers['x-field-dtype'] === 'int32' ? Int32Array : Float32Array;
+    return { rows, cols, data: new TypedArray(response.data) };
   }
 };
\ No newline at end of file